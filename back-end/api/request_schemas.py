@@ -93,6 +93,7 @@ class SelectSchemaRequest(BaseModel):
 class GetTableSchemaRequest(BaseModel):
     """Schema for /get_table_schema"""
     table_name: str = Field(..., min_length=1, max_length=255)
+    exact_count: bool = False  # COUNT(*) instead of the statistics estimate
     
     @field_validator('table_name')
     @classmethod
@@ -28,10 +28,10 @@ async def get_user_context(user: dict = Depends(get_current_user)):
     from services.context_service import ContextService
     
     user_id = user.get('uid') or user
-    context = await run_in_threadpool(ContextService.get_full_context, user_id)
+    context = await ContextService.get_full_context_async(user_id)
     
     # Convert schemas dict to array for frontend
-    schemas_dict = context.get('schemas', {})
+    schemas_dict = context.schemas
     schemas_list = []
     for db_name, schema_data in schemas_dict.items():
         schemas_list.append({
@@ -43,9 +43,9 @@ async def get_user_context(user: dict = Depends(get_current_user)):
     
     return {
         'status': 'success',
-        'connection': context.get('connection', {'connected': False}),
+        'connection': context.connection,
         'schemas': schemas_list,
-        'recent_queries': context.get('recent_queries', [])
+        'recent_queries': context.recent_queries
     }
 
 
@@ -110,8 +110,8 @@ async def delete_all_schema_caches(user: dict = Depends(get_current_user)):
     
     user_id = user.get('uid') or user
     # Get all schemas first
-    context = await run_in_threadpool(ContextService.get_full_context, user_id)
-    schemas = context.get('schemas', {})
+    context = await ContextService.get_full_context_async(user_id)
+    schemas = context.schemas
     
     # Delete each schema cache
     for db_name in schemas.keys():
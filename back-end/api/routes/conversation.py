@@ -8,7 +8,12 @@ from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from fastapi.concurrency import run_in_threadpool
 
-from dependencies import get_current_user, get_db_config
+from dependencies import (
+    get_current_user,
+    get_db_config,
+    get_conversation_id,
+    update_session_data,
+)
 from services.conversation_service import ConversationService
 from api.request_schemas import ChatRequest
 
@@ -36,10 +41,18 @@ async def pass_user_prompt_to_llm(
     response_style = data.response_style
     max_rows = data.max_rows
     
-    conversation_id = ConversationService.create_or_get_conversation_id(data.conversation_id)
+    provided_id = data.conversation_id
+    is_new_conversation = not provided_id  # Server-issued IDs have no stored history
+    if not provided_id:
+        # Reuse the id handed out by /new_conversation (consumed once) instead of
+        # minting a second one for the same chat
+        provided_id = await get_conversation_id(request)
+        if provided_id:
+            await update_session_data(request, {'conversation_id': None})
+    conversation_id = ConversationService.create_or_get_conversation_id(provided_id)
     user_id = user.get('uid') or user
     
-    logger.debug(f'Received prompt for conversation: {conversation_id}')
+    logger.debug('Received prompt for conversation: %s', conversation_id)
     
     # 1. Check user quota (fast, Redis-based)
     user_quota = request.app.state.user_quota
@@ -73,17 +86,16 @@ async def pass_user_prompt_to_llm(
     try:
         async def async_generator():
             try:
-                generator = await run_in_threadpool(
-                    ConversationService.create_streaming_generator,
+                async for chunk in ConversationService.create_streaming_generator_async(
                     conversation_id, prompt, user_id,
                     db_config=db_config,
                     enable_reasoning=enable_reasoning,
                     reasoning_effort=reasoning_effort,
                     response_style=response_style,
                     max_rows=max_rows,
-                    api_key=api_key
-                )
-                for chunk in generator:
+                    api_key=api_key,
+                    is_new_conversation=is_new_conversation
+                ):
                     yield chunk
             finally:
                 # Release rate limiter when streaming completes
@@ -137,9 +149,11 @@ async def get_conversations(user: dict = Depends(get_current_user)):
 
 
 @router.post('/new_conversation')
-async def new_conversation(user: dict = Depends(get_current_user)):
+async def new_conversation(request: Request, user: dict = Depends(get_current_user)):
     """Create a new conversation."""
     conversation_id = ConversationService.create_or_get_conversation_id()
+    # Remember it so a first prompt sent without an id lands in this conversation
+    await update_session_data(request, {'conversation_id': conversation_id})
     return {'status': 'success', 'conversation_id': conversation_id}
 
 
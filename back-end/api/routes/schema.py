@@ -74,7 +74,7 @@ async def get_table_schema_route(
     """Get schema information for a specific table."""
     result = await run_in_threadpool(
         DatabaseService.get_table_info,
-        db_config, data.table_name
+        db_config, data.table_name, data.exact_count
     )
     
     if result.get('status') == 'error':
@@ -34,12 +34,27 @@ class Config:
     LLM_MAX_CONCURRENT = int(os.getenv('LLM_MAX_CONCURRENT', 5))
     LLM_QUEUE_TIMEOUT = int(os.getenv('LLM_QUEUE_TIMEOUT', 60))
     
+    # Answers to tool-free prompts, keyed on the exact message list
+    LLM_RESPONSE_CACHE_TTL = int(os.getenv('LLM_RESPONSE_CACHE_TTL', 300))  # Seconds, 0 disables
+    LLM_RESPONSE_CACHE_MAX = int(os.getenv('LLM_RESPONSE_CACHE_MAX', 1024))  # Entries
+    
     # Per-User Quota (Redis-based)
     USER_QUOTA_ENABLED = os.getenv('USER_QUOTA_ENABLED', 'True').lower() == 'true'
     USER_QUOTA_PER_MINUTE = int(os.getenv('USER_QUOTA_PER_MINUTE', 4))
     USER_QUOTA_PER_HOUR = int(os.getenv('USER_QUOTA_PER_HOUR', 100))
     USER_QUOTA_PER_DAY = int(os.getenv('USER_QUOTA_PER_DAY', 500))
     
+    # Conversation history and LLM answers shared across workers via Redis
+    SHARED_CACHE_ENABLED = os.getenv('SHARED_CACHE_ENABLED', 'True').lower() == 'true'
+    
+    @staticmethod
+    def get_redis_url():
+        """Get the Upstash Redis URL (forced to rediss:// for TLS), or None if unset"""
+        redis_url = os.getenv('UPSTASH_REDIS_URL')
+        if redis_url and redis_url.startswith('redis://'):
+            redis_url = redis_url.replace('redis://', 'rediss://', 1)
+        return redis_url or None
+    
     # Firebase credentials from environment variables
     @staticmethod
     def get_firebase_credentials():
@@ -105,6 +120,9 @@ class Config:
     # Thread Pool Configuration
     MAX_WORKERS = int(os.getenv('MAX_WORKERS', 32))
     
+    # Pooled Firestore clients for conversation reads/writes (one gRPC channel each)
+    FIRESTORE_POOL_CLIENTS = int(os.getenv('FIRESTORE_POOL_CLIENTS', 4))
+    
     # Logging Configuration (base default)
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
@@ -158,6 +176,15 @@ class Config:
     QUERY_TIMEOUT_SECONDS = int(os.getenv('QUERY_TIMEOUT_SECONDS', 30))  # Query timeout
     MAX_QUERY_LENGTH = int(os.getenv('MAX_QUERY_LENGTH', 10000))  # Max characters in query
     
+    # Table list / schema / row count cache (schema metadata changes rarely)
+    METADATA_CACHE_TTL = int(os.getenv('METADATA_CACHE_TTL', 60))  # Seconds
+    METADATA_CACHE_MAX = int(os.getenv('METADATA_CACHE_MAX', 512))  # Entries
+    
+    # SELECT result cache (repeated dashboard-style queries). Off by default:
+    # cached rows can be stale after writes from other clients.
+    QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', 0))  # Seconds, 0 disables
+    QUERY_CACHE_MAX = int(os.getenv('QUERY_CACHE_MAX', 256))  # Entries
+    
     # Session/Cookie Configuration (base defaults)
     SESSION_COOKIE_SECURE = False  # Override in production
     SESSION_COOKIE_HTTPONLY = True
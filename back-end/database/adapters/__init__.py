@@ -5,6 +5,8 @@ Provides abstraction layer for different database types (MySQL, PostgreSQL, SQLi
 using the Adapter Pattern.
 """
 
+from functools import lru_cache
+
 from .base_adapter import BaseDatabaseAdapter
 from .mysql_adapter import MySQLAdapter
 from .postgresql_adapter import PostgreSQLAdapter
@@ -30,22 +32,29 @@ def get_adapter(db_type: str) -> BaseDatabaseAdapter:
         db_type: Database type ('mysql', 'postgresql', 'sqlite', 'sqlserver', 'oracle')
 
     Returns:
-        Database adapter instance
+        Database adapter instance (shared; adapters hold no per-connection state)
 
     Raises:
         ValueError: If database type is not supported
     """
-    adapters = {
-        'mysql': MySQLAdapter,
-        'postgresql': PostgreSQLAdapter,
-        'sqlite': SQLiteAdapter,
-        'sqlserver': SQLServerAdapter,
-        'oracle': OracleAdapter,
-    }
-
     db_type = db_type.lower()
-    if db_type not in adapters:
-        raise ValueError(f"Unsupported database type: {db_type}. Supported types: {', '.join(adapters.keys())}")
+    if db_type not in _ADAPTERS:
+        raise ValueError(f"Unsupported database type: {db_type}. Supported types: {', '.join(_ADAPTERS.keys())}")
+
+    return _adapter_instance(db_type)
+
+
+_ADAPTERS = {
+    'mysql': MySQLAdapter,
+    'postgresql': PostgreSQLAdapter,
+    'sqlite': SQLiteAdapter,
+    'sqlserver': SQLServerAdapter,
+    'oracle': OracleAdapter,
+}
+
 
-    return adapters[db_type]()
+@lru_cache(maxsize=None)
+def _adapter_instance(db_type: str) -> BaseDatabaseAdapter:
+    """One adapter per type, so memoized adapter queries are reused."""
+    return _ADAPTERS[db_type]()
 
@@ -275,6 +275,23 @@ class BaseDatabaseAdapter(ABC):
         # Default: not supported, return empty
         return None, []
     
+    def get_row_count_estimate_query(self, db_name: str, table_name: str, schema: str = 'public') -> tuple:
+        """
+        Return SQL query and params for a cheap (statistics-based) row count.
+        
+        Args:
+            db_name: Database name
+            table_name: Table name
+            schema: Schema name (PostgreSQL)
+            
+        Returns:
+            Tuple of (query_string, params_tuple); query returns one integer
+        """
+        return (
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (db_name, table_name)
+        )
+    
     # =========================================================================
     # Schema Metadata Methods (for AI tools)
     # =========================================================================
@@ -7,13 +7,14 @@ Implements database operations for PostgreSQL using psycopg2.
 import logging
 from typing import Any, Dict, Optional
 from contextlib import contextmanager
+from functools import lru_cache
 from .base_adapter import BaseDatabaseAdapter
 
 logger = logging.getLogger(__name__)
 
 try:
     import psycopg2
-    from psycopg2 import pool, extras
+    from psycopg2 import pool, extras, sql
     POSTGRESQL_AVAILABLE = True
     _ = psycopg2  # Mark as used for import check pattern
 except ImportError:
@@ -157,24 +158,27 @@ class PostgreSQLAdapter(BaseDatabaseAdapter):
             WHERE datistemplate = false
         """
 
-    def get_schemas_query(self) -> str:
-        """SQL query to list PostgreSQL schemas in current database."""
-        return """
+    _SCHEMAS_QUERY = """
             SELECT schema_name
             FROM information_schema.schemata
             WHERE schema_name NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
             ORDER BY schema_name
         """
 
-    def get_tables_query(self, schema: str = 'public') -> str:
+    def get_schemas_query(self) -> str:
+        """SQL query to list PostgreSQL schemas in current database."""
+        return self._SCHEMAS_QUERY
+
+    @lru_cache(maxsize=64)
+    def get_tables_query(self, schema: str = 'public') -> 'sql.Composed':
         """SQL query to list PostgreSQL tables in a specific schema."""
-        # Use format to inject schema name safely (schema names are identifiers)
-        return f"""
+        # Built once per schema; the name is quoted as a literal by psycopg2
+        return sql.SQL("""
             SELECT table_name
             FROM information_schema.tables
-            WHERE table_schema = '{schema}'
+            WHERE table_schema = {}
             AND table_type = 'BASE TABLE'
-        """
+        """).format(sql.Literal(schema))
 
     def get_table_schema_query(self, schema: str = 'public') -> str:
         """SQL query to get PostgreSQL table schema in a specific schema."""
@@ -300,25 +304,34 @@ class PostgreSQLAdapter(BaseDatabaseAdapter):
     # Schema Caching Methods (for AI context)
     # =========================================================================
     
+    # The cache queries read pg_catalog directly: information_schema views
+    # are layered over it with extra joins and per-row privilege checks.
+    # Only tables the user can SELECT from are listed (as the AI can't query others).
+    
     def get_all_tables_for_cache(self, db_name: str, schema: str = 'public') -> tuple:
         """Return SQL query and params to get all tables for schema caching."""
-        query = f"""
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = '{schema}' AND table_type = 'BASE TABLE'
-            ORDER BY table_name
+        query = """
+            SELECT c.relname
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+            AND has_table_privilege(c.oid, 'SELECT')
+            ORDER BY c.relname
         """
-        return query, ()  # No params needed, schema is embedded
+        return query, (schema,)
     
     def get_columns_for_table_cache(self, db_name: str, table_name: str, schema: str = 'public') -> tuple:
         """Return SQL query and params to get column names for a table."""
-        query = f"""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_schema = '{schema}' AND table_name = %s
-            ORDER BY ordinal_position
+        query = """
+            SELECT a.attname
+            FROM pg_catalog.pg_attribute a
+            JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s
+            AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY a.attnum
         """
-        return query, (table_name,)
+        return query, (schema, table_name)
     
     def get_column_details_for_table(self, db_name: str, table_name: str, schema: str = 'public') -> tuple:
         """Return SQL query and params to get full column details for a table."""
@@ -355,14 +368,27 @@ class PostgreSQLAdapter(BaseDatabaseAdapter):
         if not tables:
             return None, []
         
-        query = f"""
-            SELECT table_name, column_name
-            FROM information_schema.columns
-            WHERE table_schema = '{schema}'
-            AND table_name = ANY(%s)
-            ORDER BY table_name, ordinal_position
+        query = """
+            SELECT c.relname, a.attname
+            FROM pg_catalog.pg_attribute a
+            JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+            AND c.relname = ANY(%s)
+            AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY c.relname, a.attnum
+        """
+        return query, (schema, list(tables))
+    
+    def get_row_count_estimate_query(self, db_name: str, table_name: str, schema: str = 'public') -> tuple:
+        """Planner estimate from pg_class (COUNT(*) would scan the table)."""
+        query = """
+            SELECT c.reltuples::bigint
+            FROM pg_catalog.pg_class c
+            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s
         """
-        return query, (tables,)
+        return query, (schema, table_name)
     
     # =========================================================================
     # Schema Metadata Methods (for AI tools)
@@ -11,6 +11,9 @@ from typing import Dict
 
 logger = logging.getLogger(__name__)
 
+_CONN_DB_NAME_RE = re.compile(r'/([^/?]+)(\?|$)')
+_CONN_HOST_RE = re.compile(r'@([^/:]+)')
+
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -27,8 +30,8 @@ def _clear_cache():
 
 def _parse_connection_string(connection_string: str) -> Dict[str, str]:
     """Parse connection string to extract database name and host."""
-    db_match = re.search(r'/([^/?]+)(\?|$)', connection_string)
-    host_match = re.search(r'@([^/:]+)', connection_string)
+    db_match = _CONN_DB_NAME_RE.search(connection_string)
+    host_match = _CONN_HOST_RE.search(connection_string)
     
     return {
         'database': db_match.group(1) if db_match else 'remote_db',
@@ -48,32 +51,66 @@ def _sync_context(user_id: str, db_type: str, database: str, host: str, is_remot
         logger.warning(f"Failed to sync context: {e}")
 
 
-def _cache_schema(user_id: str, db_config: dict, database: str, tables: list, db_type: str):
-    """Cache schema in Firestore for AI context."""
+def _fetch_columns(db_config: dict, database: str, tables: list, db_type: str) -> Dict[str, list]:
+    """Fetch column names for the first 20 tables (for the AI context schema cache)."""
+    from database.connection_manager import get_connection_manager
+    from database.adapters import get_adapter
+    from database.operations import fetch_first_column
+    
+    adapter = get_adapter(db_type)
+    manager = get_connection_manager()
+    
+    selected = tables[:20]
+    if not selected:
+        return {}
+    
+    # One round trip for all tables where the adapter supports it
+    batch_query, batch_params = adapter.get_batch_columns_for_tables(database, selected)
+    if batch_query is not None:
+        columns = {table: [] for table in selected}
+        try:
+            with manager.get_cursor(db_config) as cursor:
+                cursor.execute(batch_query, batch_params)
+                for table_name, column_name in cursor.fetchall():
+                    if table_name in columns:
+                        columns[table_name].append(column_name)
+            return columns
+        except Exception as e:
+            logger.debug(f"Batched column fetch failed, falling back per table: {e}")
+    
+    columns = {}
+    with manager.get_cursor(db_config) as cursor:
+        for table in selected:
+            try:
+                cols_query, cols_params = adapter.get_columns_for_table_cache(database, table)
+                cursor.execute(cols_query, cols_params)
+                columns[table] = fetch_first_column(cursor)
+            except Exception:
+                columns[table] = []
+    return columns
+
+
+def _sync_context_and_cache_schema(user_id: str, db_config: dict, db_type: str, database: str,
+                                   host: str, is_remote: bool, tables: list):
+    """Sync connection state and cache its schema in one Firestore write."""
     if not user_id:
         return
+    if not tables:
+        _sync_context(user_id, db_type, database, host, is_remote)
+        return
     try:
         from services.context_service import ContextService
-        from database.connection_manager import get_connection_manager
-        from database.adapters import get_adapter
         
-        adapter = get_adapter(db_type)
-        manager = get_connection_manager()
-        
-        columns = {}
-        with manager.get_cursor(db_config) as cursor:
-            for table in tables[:20]:
-                try:
-                    cols_query, cols_params = adapter.get_columns_for_table_cache(database, table)
-                    cursor.execute(cols_query, cols_params)
-                    columns[table] = [row[0] for row in cursor.fetchall()]
-                except Exception:
-                    columns[table] = []
-        
-        ContextService.cache_schema(user_id, database, tables, columns)
-        logger.info(f"Cached schema for {database}: {len(tables)} tables")
+        if not ContextService.ENABLED:
+            return  # Skip the column query too; nothing would be stored
+        columns = _fetch_columns(db_config, database, tables, db_type)
+        ContextService.set_connection_and_cache_schema(
+            user_id, db_type, database, host, is_remote, tables, columns
+        )
+        logger.info(f"Synced context and cached schema for {database}: {len(tables)} tables")
     except Exception as e:
-        logger.warning(f"Failed to cache schema: {e}")
+        logger.warning(f"Failed to sync context/cache schema: {e}")
+        _sync_context(user_id, db_type, database, host, is_remote)
 
 
 # =============================================================================
@@ -100,8 +137,12 @@ def connect_local_sqlite(file_path: str, user_id: str = None) -> dict:
         manager = get_connection_manager()
         conn = manager.get_connection(db_config)
         adapter = get_adapter('sqlite')
+        try:
+            connected = adapter.validate_connection(conn)
+        finally:
+            manager.release_connection(db_config, conn)
         
-        if adapter.validate_connection(conn):
+        if connected:
             dbs_result = DatabaseOperations.get_databases(db_config)
             _sync_context(user_id, 'sqlite', file_path, 'local', False)
             
@@ -142,8 +183,12 @@ def connect_local_mysql(host: str, port: int, user: str, password: str,
         manager = get_connection_manager()
         conn = manager.get_connection(db_config)
         adapter = get_adapter('mysql')
+        try:
+            connected = adapter.validate_connection(conn)
+        finally:
+            manager.release_connection(db_config, conn)
         
-        if adapter.validate_connection(conn):
+        if connected:
             dbs_result = DatabaseOperations.get_databases(db_config)
             
             if dbs_result.get('status') == 'success':
@@ -194,8 +239,12 @@ def connect_local_postgresql(host: str, port: int, user: str, password: str,
         manager = get_connection_manager()
         conn = manager.get_connection(db_config)
         adapter = get_adapter('postgresql')
+        try:
+            connected = adapter.validate_connection(conn)
+        finally:
+            manager.release_connection(db_config, conn)
         
-        if adapter.validate_connection(conn):
+        if connected:
             dbs_result = DatabaseOperations.get_databases(db_config)
             
             if dbs_result.get('status') == 'success':
@@ -227,6 +276,7 @@ def connect_remote_postgresql(connection_string: str, user_id: str = None) -> di
     """Connect to a remote PostgreSQL database using connection string."""
     from database.adapters import get_adapter
     from database.connection_manager import get_connection_manager
+    from database.operations import fetch_first_column
     
     _clear_cache()
     
@@ -245,8 +295,12 @@ def connect_remote_postgresql(connection_string: str, user_id: str = None) -> di
         manager = get_connection_manager()
         conn = manager.get_connection(db_config)
         adapter = get_adapter('postgresql')
+        try:
+            connected = adapter.validate_connection(conn)
+        finally:
+            manager.release_connection(db_config, conn)
         
-        if adapter.validate_connection(conn):
+        if connected:
             logger.info(f"Connected to remote PostgreSQL: {db_name} at {host}")
             
             # Get databases
@@ -254,7 +308,7 @@ def connect_remote_postgresql(connection_string: str, user_id: str = None) -> di
             try:
                 with manager.get_cursor(db_config) as cursor:
                     cursor.execute(adapter.get_databases_for_remote())
-                    all_databases = [row[0] for row in cursor.fetchall()]
+                    all_databases = fetch_first_column(cursor)
             except Exception:
                 all_databases = [db_name]
             
@@ -264,12 +318,11 @@ def connect_remote_postgresql(connection_string: str, user_id: str = None) -> di
                 with manager.get_cursor(db_config) as cursor:
                     query, params = adapter.get_all_tables_for_cache(db_name, 'public')
                     cursor.execute(query, params)
-                    tables = [row[0] for row in cursor.fetchall()]
+                    tables = fetch_first_column(cursor)
             except Exception as e:
                 logger.warning(f"Failed to fetch tables: {e}")
             
-            _sync_context(user_id, 'postgresql', db_name, host, True)
-            _cache_schema(user_id, db_config, db_name, tables, 'postgresql')
+            _sync_context_and_cache_schema(user_id, db_config, 'postgresql', db_name, host, True, tables)
             
             message = f'Connected to remote PostgreSQL: {db_name}'
             if tables:
@@ -295,6 +348,7 @@ def connect_remote_mysql(connection_string: str, user_id: str = None) -> dict:
     """Connect to a remote MySQL database using connection string."""
     from database.adapters import get_adapter
     from database.connection_manager import get_connection_manager
+    from database.operations import fetch_first_column
     
     _clear_cache()
     
@@ -313,8 +367,12 @@ def connect_remote_mysql(connection_string: str, user_id: str = None) -> dict:
         manager = get_connection_manager()
         conn = manager.get_connection(db_config)
         adapter = get_adapter('mysql')
+        try:
+            connected = adapter.validate_connection(conn)
+        finally:
+            manager.release_connection(db_config, conn)
         
-        if adapter.validate_connection(conn):
+        if connected:
             logger.info(f"Connected to remote MySQL: {db_name} at {host}")
             
             # Get databases
@@ -322,7 +380,7 @@ def connect_remote_mysql(connection_string: str, user_id: str = None) -> dict:
             try:
                 with manager.get_cursor(db_config) as cursor:
                     cursor.execute(adapter.get_databases_query())
-                    all_databases = [row[0] for row in cursor.fetchall()]
+                    all_databases = fetch_first_column(cursor)
                     system_dbs = adapter.get_system_databases()
                     all_databases = [db for db in all_databases if db.lower() not in system_dbs]
             except Exception:
@@ -337,12 +395,11 @@ def connect_remote_mysql(connection_string: str, user_id: str = None) -> dict:
                         WHERE TABLE_SCHEMA = '{db_name}' AND TABLE_TYPE = 'BASE TABLE'
                         ORDER BY TABLE_NAME
                     """)
-                    tables = [row[0] for row in cursor.fetchall()]
+                    tables = fetch_first_column(cursor)
             except Exception as e:
                 logger.warning(f"Failed to fetch tables: {e}")
             
-            _sync_context(user_id, 'mysql', db_name, host, True)
-            _cache_schema(user_id, db_config, db_name, tables, 'mysql')
+            _sync_context_and_cache_schema(user_id, db_config, 'mysql', db_name, host, True, tables)
             
             message = f'Connected to remote MySQL: {db_name}'
             if tables:
@@ -393,11 +450,8 @@ def select_database(db_config: dict, db_name: str, user_id: str = None) -> dict:
         
         db_type = db_config.get('db_type', 'mysql')
         host = db_config.get('host', 'local')
-        _sync_context(user_id, db_type, db_name, host, False)
-        
         tables = DatabaseOperations.get_tables(new_config, db_name)
-        if tables:
-            _cache_schema(user_id, new_config, db_name, tables, db_type)
+        _sync_context_and_cache_schema(user_id, new_config, db_type, db_name, host, False, tables)
         
         logger.info(f"Selected database: {db_name}")
         return {
@@ -35,9 +35,11 @@ class ConnectionManager:
         self._adapters: Dict[str, Any] = {}  # Database adapter per pool
         self._pool_locks: Dict[str, threading.Lock] = {}
         self._pool_last_used: Dict[str, float] = {}
+        self._pool_in_use: Dict[str, int] = {}  # Checked-out connections per pool
         self._global_lock = threading.Lock()
         self._cleanup_interval = 300  # 5 minutes
         self._pool_idle_timeout = 600  # 10 minutes
+        self._max_pools = 64  # Least recently used pool is closed beyond this
         self._thread_local = threading.local()
 
         # Start cleanup thread
@@ -81,6 +83,13 @@ class ConnectionManager:
         key_string = '|'.join(key_parts)
         return hashlib.md5(key_string.encode()).hexdigest()
 
+    def get_pool_key(self, config: dict) -> str:
+        """
+        Key identifying a configuration's pool, without creating the pool.
+        Used to scope caches per database server.
+        """
+        return self._get_pool_key(config)
+
     def _create_pool(self, config: dict, pool_key: str) -> Any:
         """
         Create a new connection pool for the given configuration using the appropriate adapter.
@@ -107,6 +116,70 @@ class ConnectionManager:
             logger.error(f"Failed to create {db_type.upper()} connection pool: {e}")
             raise
 
+    @staticmethod
+    def _validate_config(config: dict) -> None:
+        """
+        Check that a configuration has what its database type needs.
+        Connection strings carry everything; SQLite needs only a path.
+        """
+        db_type = config.get('db_type', 'mysql').lower()
+        if config.get('connection_string'):
+            return
+        if db_type != 'sqlite':
+            if not config.get('host') or not config.get('user'):
+                raise ValueError(f"{db_type.upper()} configuration must include 'host' and 'user'")
+
+    def ensure_pool(self, config: dict) -> str:
+        """
+        Create the connection pool for a configuration if it doesn't exist yet.
+        Safe to call speculatively (e.g. to warm a pool before a tool call).
+
+        Returns:
+            The pool key for the configuration
+
+        Raises:
+            ValueError: If the configuration is incomplete
+        """
+        pool_key = self._get_pool_key(config)
+
+        if pool_key not in self._pools:
+            self._validate_config(config)
+            with self._global_lock:
+                if pool_key not in self._pools:
+                    self._pools[pool_key] = self._create_pool(config, pool_key)
+                    self._pool_locks[pool_key] = threading.Lock()
+                    self._pool_last_used[pool_key] = time.time()
+                    self._pool_in_use[pool_key] = 0
+                    self._evict_lru_pools(keep=pool_key)
+
+        return pool_key
+
+    def _evict_lru_pools(self, keep: str = None):
+        """
+        Close least recently used idle pools while over _max_pools.
+        Pools for other databases stay open so switching back is free.
+        Pools with checked-out connections, and `keep` (the pool just
+        created for the caller), are never closed; if every other pool
+        is busy the limit is exceeded until some are released.
+        Caller must hold _global_lock.
+        """
+        while len(self._pools) > self._max_pools:
+            idle = [key for key, count in self._pool_in_use.items() if count == 0 and key != keep]
+            if not idle:
+                logger.warning(f"All {len(self._pools)} pools busy; over the {self._max_pools} pool limit")
+                return
+            pool_key = min(idle, key=self._pool_last_used.get)
+            try:
+                self._adapters[pool_key].close_pool(self._pools[pool_key])
+                logger.info(f"Evicted least recently used pool {pool_key[:8]}")
+            except Exception as e:
+                logger.error(f"Error evicting pool {pool_key[:8]}: {e}")
+            del self._pools[pool_key]
+            del self._adapters[pool_key]
+            del self._pool_locks[pool_key]
+            del self._pool_last_used[pool_key]
+            del self._pool_in_use[pool_key]
+
     def get_connection(self, config: dict):
         """
         Get a database connection for the given configuration.
@@ -124,35 +197,36 @@ class ConnectionManager:
         db_type = config.get('db_type', 'mysql').lower()
 
         # Validate config based on database type
-        # Skip validation for connection string based configs
-        if config.get('connection_string'):
-            pass  # Connection string has all info embedded
-        elif db_type != 'sqlite':
-            if not config.get('host') or not config.get('user'):
-                raise ValueError(f"{db_type.upper()} configuration must include 'host' and 'user'")
-
-        pool_key = self._get_pool_key(config)
+        self._validate_config(config)
 
-        # Get or create pool for this configuration
-        if pool_key not in self._pools:
+        # Mark the pool busy before acquiring so eviction can't close it
+        # under us (retry if it was evicted between ensure and the lock)
+        while True:
+            pool_key = self.ensure_pool(config)
             with self._global_lock:
-                if pool_key not in self._pools:
-                    self._pools[pool_key] = self._create_pool(config, pool_key)
-                    self._pool_locks[pool_key] = threading.Lock()
-
-        # Update last used time
-        self._pool_last_used[pool_key] = time.time()
+                if pool_key in self._pools:
+                    self._pool_in_use[pool_key] += 1
+                    self._pool_last_used[pool_key] = time.time()
+                    adapter = self._adapters[pool_key]
+                    pool = self._pools[pool_key]
+                    break
 
         # Get connection from pool using the appropriate adapter
         try:
-            adapter = self._adapters[pool_key]
-            connection = adapter.get_connection_from_pool(self._pools[pool_key])
+            connection = adapter.get_connection_from_pool(pool)
             logger.debug(f"Connection acquired from {db_type.upper()} pool {pool_key[:8]}")
             return connection
         except Exception as e:
+            self._mark_released(pool_key)
             logger.error(f"Failed to get connection from {db_type.upper()} pool {pool_key[:8]}: {e}")
             raise
 
+    def _mark_released(self, pool_key: str) -> None:
+        """Drop one checked-out connection from a pool's in-use count."""
+        with self._global_lock:
+            if self._pool_in_use.get(pool_key):
+                self._pool_in_use[pool_key] -= 1
+
     @contextmanager
     def get_cursor(self, config: dict, dictionary=False, buffered=True):
         """
@@ -167,17 +241,9 @@ class ConnectionManager:
         Yields:
             Database cursor
         """
-        pool_key = self._get_pool_key(config)
-
-        # Ensure pool exists
-        if pool_key not in self._pools:
-            with self._global_lock:
-                if pool_key not in self._pools:
-                    self._pools[pool_key] = self._create_pool(config, pool_key)
-                    self._pool_locks[pool_key] = threading.Lock()
-
-        adapter = self._adapters[pool_key]
         conn = self.get_connection(config)
+        # The checked-out connection keeps this pool from being evicted
+        adapter = self._adapters[self._get_pool_key(config)]
 
         try:
             # Use adapter's cursor context manager
@@ -185,11 +251,20 @@ class ConnectionManager:
                 yield cursor
         finally:
             # CRITICAL: Return connection to pool after cursor is closed
-            try:
-                adapter.return_connection_to_pool(self._pools[pool_key], conn)
-                logger.debug(f"Connection returned to pool {pool_key[:8]}")
-            except Exception as e:
-                logger.warning(f"Failed to return connection to pool: {e}")
+            self.release_connection(config, conn)
+
+    def release_connection(self, config: dict, conn) -> None:
+        """
+        Return a connection obtained from get_connection() to its pool.
+        """
+        pool_key = self._get_pool_key(config)
+        try:
+            self._adapters[pool_key].return_connection_to_pool(self._pools[pool_key], conn)
+            logger.debug(f"Connection returned to pool {pool_key[:8]}")
+        except Exception as e:
+            logger.warning(f"Failed to return connection to pool: {e}")
+        finally:
+            self._mark_released(pool_key)
 
     def close_pool(self, config: dict) -> bool:
         """
@@ -217,6 +292,7 @@ class ConnectionManager:
                     del self._adapters[pool_key]
                     del self._pool_locks[pool_key]
                     del self._pool_last_used[pool_key]
+                    del self._pool_in_use[pool_key]
                     logger.info(f"Closed connection pool {pool_key[:8]}")
                     return True
                 except Exception as e:
@@ -243,6 +319,7 @@ class ConnectionManager:
             self._adapters.clear()
             self._pool_locks.clear()
             self._pool_last_used.clear()
+            self._pool_in_use.clear()
             logger.info("All connection pools closed")
 
     def _cleanup_idle_pools(self):
@@ -256,6 +333,9 @@ class ConnectionManager:
             pool_keys_to_remove = []
 
             for pool_key, last_used in self._pool_last_used.items():
+                # A long-running query keeps its pool open past the idle timeout
+                if self._pool_in_use.get(pool_key):
+                    continue
                 if current_time - last_used > self._pool_idle_timeout:
                     pool_keys_to_remove.append(pool_key)
 
@@ -267,6 +347,7 @@ class ConnectionManager:
                     del self._adapters[pool_key]
                     del self._pool_locks[pool_key]
                     del self._pool_last_used[pool_key]
+                    del self._pool_in_use[pool_key]
                     logger.info(f"Cleaned up idle pool {pool_key[:8]}")
                 except Exception as e:
                     logger.error(f"Error cleaning up pool {pool_key[:8]}: {e}")
@@ -6,14 +6,52 @@ No Flask dependencies.
 """
 
 from database.security import DatabaseSecurity
+import hashlib
 import logging
+import re
 import time
 from typing import Dict, List, Tuple, Optional
-import threading
+from operator import itemgetter
 from config import Config
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+_first = itemgetter(0)
+
+
+def fetch_first_column(cursor, batch_size: int = 1000) -> List:
+    """Collect the first column of a result set, batch_size rows at a time."""
+    values = []
+    extend = values.extend
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return values
+        extend(map(_first, rows))
+
+# SQL canonicalization for the result cache. Comments and whitespace are only
+# normalized when the query has no quotes (so no literal can be altered).
+_SQL_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_SQL_WS_RE = re.compile(r'\s+')
+_SQL_QUOTES = ("'", '"', '`')
+
+# Results of these change between identical runs, so they are never cached
+_SQL_VOLATILE_RE = re.compile(
+    r'\b(?:now|random|rand|uuid|newid|sysdate|getdate|clock_timestamp|statement_timestamp'
+    r'|gen_random_uuid|current_timestamp|current_date|current_time|localtimestamp|localtime'
+    r'|systimestamp|sysdatetime|nextval)\b',
+    re.IGNORECASE
+)
+
+
+def _canon_sql(sql_query: str) -> str:
+    """Return a hash key for the query that ignores formatting differences."""
+    text = sql_query.strip().rstrip(';')
+    if not any(quote in text for quote in _SQL_QUOTES):
+        text = _SQL_WS_RE.sub(' ', _SQL_COMMENT_RE.sub(' ', text)).strip()
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
 
 class DatabaseOperationError(Exception):
     """Specific exception type for database operation failures."""
@@ -23,9 +61,16 @@ class DatabaseOperationError(Exception):
 class DatabaseOperations:
     """Database operations class - accepts db_config explicitly."""
     
-    # Cache for database and table information
-    _info_cache = {}
-    _cache_lock = threading.Lock()
+    # Cache for database and table information (and SELECT results).
+    # Keys start with the connection pool key so servers never share entries.
+    _info_cache = TTLCache(Config.METADATA_CACHE_MAX, Config.METADATA_CACHE_TTL)
+    _result_cache = TTLCache(Config.QUERY_CACHE_MAX, Config.QUERY_CACHE_TTL)
+    
+    @staticmethod
+    def _cache_key(db_config: dict, *parts) -> tuple:
+        # Pool key is derived from the config alone; a lookup never opens a pool
+        from database.connection_manager import get_connection_manager
+        return (get_connection_manager().get_pool_key(db_config),) + parts
     
     @staticmethod
     def get_databases(db_config: dict) -> Dict:
@@ -50,7 +95,7 @@ class DatabaseOperations:
             manager = get_connection_manager()
             
             # For remote PostgreSQL, use the remote-specific query
-            is_remote = bool(db_config.get('connection_string'))
+            is_remote = bool(db_config.get('is_remote'))
             if db_type == 'postgresql' and is_remote:
                 query = adapter.get_databases_for_remote()
             else:
@@ -58,7 +103,7 @@ class DatabaseOperations:
             
             with manager.get_cursor(db_config) as cursor:
                 cursor.execute(query)
-                databases = [db[0] for db in cursor.fetchall()]
+                databases = fetch_first_column(cursor)
 
             # Filter out system databases using adapter
             system_dbs = adapter.get_system_databases()
@@ -94,11 +139,17 @@ class DatabaseOperations:
             adapter = get_adapter(db_type)
             manager = get_connection_manager()
             
+            cache_key = DatabaseOperations._cache_key(db_config, 'tables', validated_db, schema)
+            tables = DatabaseOperations._info_cache.get(cache_key)
+            if tables is not None:
+                return tables
+            
             with manager.get_cursor(db_config) as cursor:
                 tables_query, tables_params = adapter.get_all_tables_for_cache(validated_db, schema)
                 cursor.execute(tables_query, tables_params)
-                tables = [table[0] for table in cursor.fetchall()]
+                tables = fetch_first_column(cursor)
             
+            DatabaseOperations._info_cache.put(cache_key, tables)
             logger.info(f"Retrieved {len(tables)} tables from database {validated_db}")
             return tables
             
@@ -120,6 +171,11 @@ class DatabaseOperations:
             
             manager = get_connection_manager()
             
+            cache_key = DatabaseOperations._cache_key(db_config, 'schema', validated_db, validated_table)
+            columns = DatabaseOperations._info_cache.get(cache_key)
+            if columns is not None:
+                return columns
+            
             with manager.get_cursor(db_config) as cursor:
                 query = """
                     SELECT COLUMN_NAME as name, DATA_TYPE as type, IS_NULLABLE as nullable, 
@@ -131,6 +187,7 @@ class DatabaseOperations:
                 cursor.execute(query, (validated_db, validated_table))
                 columns = cursor.fetchall()
             
+            DatabaseOperations._info_cache.put(cache_key, columns)
             logger.info(f"Retrieved schema for table {validated_table}")
             return columns
             
@@ -142,24 +199,49 @@ class DatabaseOperations:
             raise DatabaseOperationError("Failed to retrieve table schema")
     
     @staticmethod
-    def get_table_row_count(db_config: dict, table_name: str, db_name: str) -> int:
-        """Get table row count."""
+    def get_table_row_count(db_config: dict, table_name: str, db_name: str,
+                            exact: bool = False) -> int:
+        """
+        Get table row count.
+        
+        By default this is the database's statistics estimate (no table scan).
+        Pass exact=True to run COUNT(*) instead.
+        """
         try:
+            from database.adapters import get_adapter
             from database.connection_manager import get_connection_manager
             
             validated_table = DatabaseSecurity.validate_table_name(table_name)
             validated_db = DatabaseSecurity.validate_database_name(db_name)
+            schema = DatabaseSecurity.validate_database_name(db_config.get('schema') or 'public')
             
+            adapter = get_adapter(db_config.get('db_type', 'mysql'))
             manager = get_connection_manager()
             
+            cache_key = DatabaseOperations._cache_key(
+                db_config, 'row_count', validated_db, schema, validated_table, exact
+            )
+            row_count = DatabaseOperations._info_cache.get(cache_key)
+            if row_count is not None:
+                return row_count
+            
             with manager.get_cursor(db_config) as cursor:
-                cursor.execute(
-                    "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
-                    (validated_db, validated_table)
-                )
+                if exact:
+                    table_ref = validated_table
+                    if adapter.db_type == 'postgresql':
+                        table_ref = f'{schema}.{validated_table}'
+                    cursor.execute(f"SELECT COUNT(*) FROM {table_ref}")
+                else:
+                    query, params = adapter.get_row_count_estimate_query(
+                        validated_db, validated_table, schema
+                    )
+                    cursor.execute(query, params)
                 result = cursor.fetchone()
-                
-                return result[0] if result else 0
+            
+            # Never-analyzed PostgreSQL tables report -1
+            row_count = max(result[0] or 0, 0) if result else 0
+            DatabaseOperations._info_cache.put(cache_key, row_count)
+            return row_count
             
         except ValueError as err:
             logger.warning(f"Validation error in get_table_row_count: {err}")
@@ -171,8 +253,8 @@ class DatabaseOperations:
     @staticmethod
     def clear_cache():
         """Clear all cached data."""
-        with DatabaseOperations._cache_lock:
-            DatabaseOperations._info_cache.clear()
+        DatabaseOperations._info_cache.clear()
+        DatabaseOperations._result_cache.clear()
         try:
             DatabaseSecurity.clear_cache()
         except Exception:
@@ -259,6 +341,25 @@ def execute_sql_query(
                 'query_type_blocked': analysis['query_type']
             }
 
+        # Opt-in (QUERY_CACHE_TTL > 0): identical SELECTs within the TTL are
+        # answered from memory, except queries calling time/random functions
+        cache_key = None
+        if Config.QUERY_CACHE_TTL > 0 and not _SQL_VOLATILE_RE.search(sql_query):
+            cache_key = DatabaseOperations._cache_key(
+                db_config, 'query', db_config.get('database'), db_config.get('schema'),
+                max_rows, _canon_sql(sql_query)
+            )
+            cached = DatabaseOperations._result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Query served from cache: {cached['row_count']} rows")
+                # Fresh containers per hit; the stored snapshot stays untouched
+                result = cached['result']
+                return {
+                    **cached,
+                    'result': {'fields': list(result['fields']), 'rows': list(result['rows'])},
+                    'cached': True
+                }
+
         start_time = time.time()
         
         db_type = db_config.get('db_type', 'mysql')
@@ -302,7 +403,7 @@ def execute_sql_query(
                 message += f'{row_count} rows. '
 
             logger.info(f"Query executed: {row_count} rows in {execution_time}ms")
-            return {
+            response = {
                 'status': 'success',
                 'result': result,
                 'message': message,
@@ -312,6 +413,13 @@ def execute_sql_query(
                 'execution_time_ms': execution_time,
                 'query_type': 'SELECT'
             }
+            if cache_key is not None:
+                # Immutable snapshot (rows are DB-API tuples) so callers can't alter it
+                DatabaseOperations._result_cache.put(cache_key, {
+                    **response,
+                    'result': {'fields': tuple(column_names), 'rows': tuple(rows)}
+                })
+            return response
             
     except ValueError as err:
         logger.warning(f"Query validation error: {err}")
@@ -16,6 +16,9 @@ logger = logging.getLogger(__name__)
 # Optional bearer token authentication
 security = HTTPBearer(auto_error=False)
 
+# request.state marker for "session not loaded yet" (None means no session)
+_SESSION_NOT_LOADED = object()
+
 
 async def get_redis():
     """Get Redis client from application state."""
@@ -27,9 +30,23 @@ async def get_session_data(request: Request) -> Optional[dict]:
     """
     Get session data from Redis using session cookie.
     
+    Loaded once per request and kept on request.state, so auth, db_config
+    and conversation lookups share a single Redis read.
+    
     Returns:
         Session data dict or None if no valid session
     """
+    cached = getattr(request.state, 'session_data', _SESSION_NOT_LOADED)
+    if cached is not _SESSION_NOT_LOADED:
+        return cached
+    
+    session_data = await _load_session_data(request)
+    request.state.session_data = session_data
+    return session_data
+
+
+async def _load_session_data(request: Request) -> Optional[dict]:
+    """Read and decode the session document from Redis."""
     redis_client = await get_redis()
     if not redis_client:
         return None
@@ -93,8 +110,8 @@ async def get_current_user(
     # Method 2: Fallback to Redis session (legacy support)
     session_data = await get_session_data(request)
     if session_data and 'user' in session_data:
-        user = session_data['user']
-        user['verified'] = False  # Session-based, not token-verified
+        # Copy: session_data is shared for the rest of the request
+        user = {**session_data['user'], 'verified': False}  # Session-based, not token-verified
         request.state.user = user
         logger.debug(f'Session auth for user: {user}')
         return user
@@ -200,6 +217,9 @@ async def set_session_data(
     if not session_id:
         session_id = str(uuid.uuid4())
     
+    # The cached copy belongs to the cookie's session, which may differ
+    request.state.session_data = _SESSION_NOT_LOADED
+    
     await redis_client.set(
         f"session:{session_id}",
         json.dumps(data),
@@ -233,7 +253,7 @@ async def update_session_data(
     if not session_data:
         return False
     
-    # Merge updates
+    # Merge updates (also updates this request's cached copy)
     session_data.update(updates)
     
     redis_client = await get_redis()
@@ -262,6 +282,7 @@ async def clear_session(request: Request) -> bool:
     redis_client = await get_redis()
     if redis_client:
         await redis_client.delete(f"session:{session_id}")
+        request.state.session_data = None
         return True
     
     return False
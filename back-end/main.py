@@ -1,6 +1,6 @@
 """FastAPI application entry point"""
 
-import os
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -13,7 +13,8 @@ from slowapi.errors import RateLimitExceeded
 import redis.asyncio as redis
 
 from config import get_config, ProductionConfig
-from services.firestore_service import FirestoreService
+from services.firestore_service import FirestoreService, warmup_firestore
+from services.shared_cache import get_shared_redis, close_shared_redis
 from services.rate_limiting import create_rate_limiter, create_user_quota_service
 
 
@@ -50,18 +51,19 @@ async def lifespan(app: FastAPI):
         logger.error(f"Firebase configuration error: {e}")
         raise
     
-    # Initialize Firebase/Firestore
+    # Initialize Firebase/Firestore and pre-open its channel
     FirestoreService.initialize()
+    await asyncio.to_thread(warmup_firestore)
     
-    # Initialize Redis for sessions
-    redis_url = os.getenv('UPSTASH_REDIS_URL')
+    # Initialize Redis for sessions (rediss:// - Upstash requires TLS)
+    redis_url = AppConfig.get_redis_url()
     if redis_url:
-        # Convert redis:// to rediss:// for TLS (Upstash requires TLS)
-        if redis_url.startswith('redis://'):
-            redis_url = redis_url.replace('redis://', 'rediss://', 1)
-        
         redis_client = redis.from_url(redis_url, decode_responses=True)
         logger.info("✅ Redis session storage enabled (Upstash)")
+        
+        # Worker threads share history and cached answers through the same instance
+        if get_shared_redis() is not None:
+            logger.info("✅ Shared conversation cache enabled (Redis)")
     else:
         logger.warning("⚠️ UPSTASH_REDIS_URL not set, using in-memory sessions (not recommended for production)")
     
@@ -77,8 +79,14 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    from services.context_service import ContextService
+    from services.conversation_service import ConversationService
+    await asyncio.to_thread(ContextService.flush_all_writes)
+    await asyncio.to_thread(ConversationService.flush_pending_writes)
+    
     if redis_client:
         await redis_client.close()
+        close_shared_redis()
         logger.info("Redis connection closed")
 
 
@@ -7,15 +7,29 @@ Collection: user_context/{user_id}
 
 import logging
 from datetime import datetime
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _ref_for(doc_id: str):
+    """
+    Cached DocumentReference for a normalized user id.
+    
+    References are immutable handles, so reusing them is safe.
+    For testing, call _ref_for.cache_clear() to reset.
+    """
+    from services.firestore_service import get_firestore_db
+    return get_firestore_db().collection(ContextRepository.COLLECTION_NAME).document(doc_id)
+
+
 class ContextRepository:
     """Data access layer for user context in Firestore."""
     
     COLLECTION_NAME = 'user_context'
+    MAX_BATCH_WRITES = 500  # Firestore WriteBatch limit
     
     @staticmethod
     def _normalize_user_id(user_id) -> str:
@@ -35,10 +49,7 @@ class ContextRepository:
         Returns:
             DocumentReference for the user's context document
         """
-        from services.firestore_service import FirestoreService
-        user_id = ContextRepository._normalize_user_id(user_id)
-        db = FirestoreService.get_db()
-        return db.collection(ContextRepository.COLLECTION_NAME).document(user_id)
+        return _ref_for(ContextRepository._normalize_user_id(user_id))
     
     @staticmethod
     def get(user_id: str) -> Dict:
@@ -58,6 +69,45 @@ class ContextRepository:
             logger.error(f"Error getting context for user {user_id}: {e}")
             return {}
     
+    @staticmethod
+    def get_recent_queries(user_id: str) -> Optional[List[Dict]]:
+        """
+        Read only the recent_queries array.
+        
+        Args:
+            user_id: User identifier
+            
+        Returns:
+            The stored array ([] if none yet), or None if the read failed
+        """
+        try:
+            doc = ContextRepository.get_ref(user_id).get(field_paths=['recent_queries'])
+            return (doc.to_dict() or {}).get('recent_queries', []) if doc.exists else []
+        except Exception as e:
+            logger.error(f"Error getting recent queries for user {user_id}: {e}")
+            return None
+    
+    @staticmethod
+    async def get_async(user_id: str) -> Dict:
+        """
+        Get full context document using the async Firestore client.
+        
+        Args:
+            user_id: User identifier
+            
+        Returns:
+            Context document as dict, or empty dict if not exists
+        """
+        from services.firestore_service import get_firestore_async_db
+        try:
+            doc_id = ContextRepository._normalize_user_id(user_id)
+            ref = get_firestore_async_db().collection(ContextRepository.COLLECTION_NAME).document(doc_id)
+            doc = await ref.get()
+            return doc.to_dict() if doc.exists else {}
+        except Exception as e:
+            logger.error(f"Error getting context for user {user_id}: {e}")
+            return {}
+    
     @staticmethod
     def update(user_id: str, data: Dict) -> bool:
         """
@@ -78,6 +128,71 @@ class ContextRepository:
             logger.error(f"Error updating context for user {user_id}: {e}")
             return False
     
+    @staticmethod
+    def update_many(updates: Dict[str, Dict]) -> bool:
+        """
+        Merge several users' context updates using WriteBatch commits.
+        
+        Args:
+            updates: Normalized user id -> fields to merge
+            
+        Returns:
+            True if every batch committed, False otherwise
+        """
+        from services.firestore_service import get_firestore_db
+        
+        now = datetime.now()
+        items = list(updates.items())
+        ok = True
+        for start in range(0, len(items), ContextRepository.MAX_BATCH_WRITES):
+            batch = get_firestore_db().batch()
+            for user_id, data in items[start:start + ContextRepository.MAX_BATCH_WRITES]:
+                data['updated_at'] = now
+                batch.set(ContextRepository.get_ref(user_id), data, merge=True)
+            try:
+                batch.commit()
+            except Exception as e:
+                logger.error(f"Error committing context batch: {e}")
+                ok = False
+        return ok
+    
+    @staticmethod
+    def field_path(*parts: str) -> str:
+        """Build an escaped Firestore field path (safe for names with dots, e.g. 'app.db')."""
+        from google.cloud.firestore import FieldPath
+        return FieldPath(*parts).to_api_repr()
+    
+    @staticmethod
+    def patch(user_id: str, patch: Dict) -> bool:
+        """
+        Apply targeted field updates with update() (no deep merge).
+        
+        Keys are field paths, see field_path(). If the document does not
+        exist yet (a new user's first connect) it is created first.
+        
+        Args:
+            user_id: User identifier
+            patch: Field path -> value
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        from google.api_core.exceptions import NotFound
+        
+        patch['updated_at'] = datetime.now()
+        try:
+            ref = ContextRepository.get_ref(user_id)
+            try:
+                ref.update(patch)
+            except NotFound:
+                logger.debug(f"Creating context for user {user_id} on first patch")
+                ref.set({'updated_at': patch['updated_at']}, merge=True)
+                ref.update(patch)
+            return True
+        except Exception as e:
+            logger.error(f"Error patching context for user {user_id}: {e}")
+            return False
+    
     @staticmethod
     def delete(user_id: str) -> bool:
         """
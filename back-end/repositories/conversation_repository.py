@@ -12,6 +12,13 @@ from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# THINKING marker patterns, compiled once (applied to every stored AI message)
+_THINKING_CHUNK_RE = re.compile(r'\[\[THINKING:chunk:(.*?)\]\]', re.DOTALL)
+_THINKING_START_RE = re.compile(r'\[\[THINKING:start\]\]')
+_THINKING_END_RE = re.compile(r'\[\[THINKING:end\]\]')
+_THINKING_INCOMPLETE_TAIL_RE = re.compile(r'\[\[THINKING:[^\]]*\]?$')  # Incomplete at end
+_THINKING_SINGLE_BRACKET_RE = re.compile(r'\[\[THINKING:[^\]]*\](?!\])')  # Single ] instead of ]]
+
 
 class ConversationRepository:
     """Data access layer for conversations in Firestore."""
@@ -34,18 +41,21 @@ class ConversationRepository:
 
         thinking_content = ''
 
-        # Extract thinking content from chunks (handles complete markers)
-        thinking_chunks = re.findall(r'\[\[THINKING:chunk:(.*?)\]\]', text, re.DOTALL)
-        if thinking_chunks:
-            thinking_content = ''.join(thinking_chunks)
+        # Streamed responses no longer carry THINKING markers (reasoning is
+        # collected separately), so the regex passes only run for legacy text
+        if '[[THINKING:' in text:
+            # Extract thinking content from chunks (handles complete markers)
+            thinking_chunks = _THINKING_CHUNK_RE.findall(text)
+            if thinking_chunks:
+                thinking_content = ''.join(thinking_chunks)
 
-        # Strip thinking markers (handles both complete and incomplete markers)
-        text = re.sub(r'\[\[THINKING:start\]\]', '', text)
-        text = re.sub(r'\[\[THINKING:chunk:.*?\]\]', '', text, flags=re.DOTALL)  # Complete markers
-        text = re.sub(r'\[\[THINKING:end\]\]', '', text)
-        # Clean up any remaining incomplete THINKING markers (without proper closing ]])
-        text = re.sub(r'\[\[THINKING:[^\]]*\]?$', '', text)  # Incomplete at end
-        text = re.sub(r'\[\[THINKING:[^\]]*\](?!\])', '', text)  # Single ] instead of ]]
+            # Strip thinking markers (handles both complete and incomplete markers)
+            text = _THINKING_START_RE.sub('', text)
+            text = _THINKING_CHUNK_RE.sub('', text)  # Complete markers
+            text = _THINKING_END_RE.sub('', text)
+            # Clean up any remaining incomplete THINKING markers (without proper closing ]])
+            text = _THINKING_INCOMPLETE_TAIL_RE.sub('', text)
+            text = _THINKING_SINGLE_BRACKET_RE.sub('', text)
 
         # NOTE: Tool markers [[TOOL:...]] are intentionally KEPT in content
         # This ensures tools render inline with text in correct order after page refresh,
@@ -142,7 +152,7 @@ class ConversationRepository:
         """
         from services.firestore_service import FirestoreService
         try:
-            db = FirestoreService.get_db()
+            db = FirestoreService.get_pooled_db()
             doc = db.collection(ConversationRepository.COLLECTION_NAME).document(conversation_id).get()
             if doc.exists:
                 return doc.to_dict()
@@ -151,6 +161,37 @@ class ConversationRepository:
             logger.error(f"Error retrieving conversation {conversation_id}: {e}")
             raise
     
+    @staticmethod
+    def get_tail(conversation_id: str, limit: int = 20) -> List[Dict]:
+        """
+        Get the most recent messages of a conversation, oldest first.
+        
+        Messages are embedded in the conversation document, so this projects
+        the read down to the 'messages' field and slices client-side.
+        
+        Args:
+            conversation_id: The conversation ID
+            limit: Maximum number of messages to return
+            
+        Returns:
+            List of message dicts (empty if conversation doesn't exist)
+        """
+        from services.firestore_service import FirestoreService
+        try:
+            db = FirestoreService.get_pooled_db()
+            doc = (
+                db.collection(ConversationRepository.COLLECTION_NAME)
+                .document(conversation_id)
+                .get(field_paths=['messages'])
+            )
+            if not doc.exists:
+                return []
+            messages = (doc.to_dict() or {}).get('messages') or []
+            return messages[-limit:]
+        except Exception as e:
+            logger.error(f"Error retrieving conversation tail {conversation_id}: {e}")
+            raise
+    
     @staticmethod
     def get_by_user(user_id: str) -> List[Dict]:
         """
@@ -166,7 +207,7 @@ class ConversationRepository:
         from google.cloud.firestore_v1 import FieldFilter
         
         try:
-            db = FirestoreService.get_db()
+            db = FirestoreService.get_pooled_db()
             conversations = (
                 db.collection(ConversationRepository.COLLECTION_NAME)
                 .where(filter=FieldFilter('user_id', '==', user_id))
@@ -199,7 +240,7 @@ class ConversationRepository:
         message: str, 
         user_id: str, 
         tools: List[Dict] = None
-    ) -> None:
+    ) -> Dict:
         """
         Store a message in a conversation.
         
@@ -212,51 +253,139 @@ class ConversationRepository:
             message: The message content
             user_id: The user ID (owner)
             tools: Optional list of tools used (for AI messages)
+            
+        Returns:
+            The stored message object (with cleaned content)
         """
-        from services.firestore_service import FirestoreService
-        from firebase_admin import firestore
-        
         try:
-            db = FirestoreService.get_db()
-            conversation_ref = db.collection(ConversationRepository.COLLECTION_NAME).document(conversation_id)
-            
-            # Create conversation if it doesn't exist
-            if not conversation_ref.get().exists:
-                conversation_ref.set({
-                    'user_id': user_id,
-                    'timestamp': datetime.now(),
-                    'messages': []
-                })
+            message_data = ConversationRepository._build_message(sender, message, tools)
+            ConversationRepository.store_messages_batch(conversation_id, [message_data], user_id)
+            logger.debug("Conversation %s updated successfully", conversation_id)
+            return message_data
+        except Exception as e:
+            logger.error(f"Error storing message in conversation {conversation_id}: {e}")
+            raise
+    
+    @staticmethod
+    def store_message_pair(
+        conversation_id: str,
+        user_message: str,
+        ai_message: Optional[str],
+        user_id: str,
+        tools: List[Dict] = None,
+        turn_id: str = None,
+        timestamp: datetime = None,
+        thinking: str = None
+    ) -> List[Dict]:
+        """
+        Store a user prompt and its AI response in a single write.
+        
+        Passing the same turn_id and timestamp on a retry produces identical
+        message objects, which ArrayUnion ignores - so retries never duplicate.
+        
+        Args:
+            conversation_id: The conversation ID
+            user_message: The user's prompt
+            ai_message: The AI response (None to store only the prompt)
+            user_id: The user ID (owner)
+            tools: Optional list of tools used (for the AI message)
+            turn_id: Optional deterministic turn ID (messages get '<turn_id>_user'/'_ai')
+            timestamp: Optional message timestamp (defaults to now)
+            thinking: Optional reasoning text collected while streaming (for the AI message)
             
-            # Clean the message content for storage and extract thinking
-            if sender == 'ai':
-                clean_message, thinking_content = ConversationRepository._strip_markers(message)
-            else:
-                clean_message = message
-                thinking_content = ''
+        Returns:
+            The stored message objects, in order
+        """
+        try:
+            timestamp = timestamp or datetime.now()
+            messages = [ConversationRepository._build_message(
+                'user', user_message,
+                message_id=f'{turn_id}_user' if turn_id else None, timestamp=timestamp
+            )]
+            if ai_message is not None:
+                messages.append(ConversationRepository._build_message(
+                    'ai', ai_message, tools,
+                    message_id=f'{turn_id}_ai' if turn_id else None, timestamp=timestamp,
+                    thinking=thinking
+                ))
+            ConversationRepository.store_messages_batch(conversation_id, messages, user_id)
+            logger.debug("Conversation %s updated with %d messages", conversation_id, len(messages))
+            return messages
+        except Exception as e:
+            logger.error(f"Error storing messages in conversation {conversation_id}: {e}")
+            raise
+    
+    @staticmethod
+    def _build_message(
+        sender: str,
+        message: str,
+        tools: List[Dict] = None,
+        message_id: str = None,
+        timestamp: datetime = None,
+        thinking: str = None
+    ) -> Dict:
+        """Build the stored message object (AI messages have markers stripped)."""
+        # Clean the message content for storage and extract thinking
+        if sender == 'ai':
+            clean_message, thinking_content = ConversationRepository._strip_markers(message)
+            # Reasoning captured from the stream takes precedence over marker extraction
+            thinking_content = thinking or thinking_content
+        else:
+            clean_message = message
+            thinking_content = ''
 
-            # Build the message object
-            message_data = {
-                'sender': sender,
-                'content': clean_message,
-                'timestamp': datetime.now()
-            }
+        # Build the message object
+        message_data = {
+            'sender': sender,
+            'content': clean_message,
+            'timestamp': timestamp or datetime.now()
+        }
 
-            # Add thinking content if present (for AI messages with reasoning)
-            if thinking_content:
-                message_data['thinking'] = thinking_content
+        if message_id:
+            message_data['id'] = message_id
 
-            # Add tools info if provided (for AI messages)
-            if tools:
-                message_data['tools'] = tools
-            
+        # Add thinking content if present (for AI messages with reasoning)
+        if thinking_content:
+            message_data['thinking'] = thinking_content
+
+        # Add tools info if provided (for AI messages)
+        if tools:
+            message_data['tools'] = tools
+        
+        return message_data
+    
+    @staticmethod
+    def store_messages_batch(conversation_id: str, messages: List[Dict], user_id: str) -> None:
+        """
+        Append already-built message objects to a conversation in one write.
+        
+        Existing conversations (the common case) take a single ArrayUnion
+        update with no existence read; a new conversation is created on the
+        NotFound fallback.
+        
+        Args:
+            conversation_id: The conversation ID
+            messages: Message objects from _build_message, in order
+            user_id: The user ID (owner)
+        """
+        from services.firestore_service import FirestoreService
+        from firebase_admin import firestore
+        from google.api_core.exceptions import NotFound
+        
+        db = FirestoreService.get_pooled_db()
+        conversation_ref = db.collection(ConversationRepository.COLLECTION_NAME).document(conversation_id)
+        
+        try:
             conversation_ref.update({
-                'messages': firestore.ArrayUnion([message_data])
+                'messages': firestore.ArrayUnion(messages)
+            })
+        except NotFound:
+            # New conversation: create it with the messages in one write
+            conversation_ref.set({
+                'user_id': user_id,
+                'timestamp': datetime.now(),
+                'messages': messages
             })
-            logger.debug(f"Conversation {conversation_id} updated successfully")
-        except Exception as e:
-            logger.error(f"Error storing message in conversation {conversation_id}: {e}")
-            raise
     
     @staticmethod
     def delete(conversation_id: str, user_id: str) -> bool:
@@ -277,7 +406,7 @@ class ConversationRepository:
         from services.firestore_service import FirestoreService
         
         try:
-            db = FirestoreService.get_db()
+            db = FirestoreService.get_pooled_db()
             conversation_ref = db.collection(ConversationRepository.COLLECTION_NAME).document(conversation_id)
             conversation = conversation_ref.get()
             
@@ -6,6 +6,8 @@ No Flask dependencies.
 """
 
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,79 @@ logger = logging.getLogger(__name__)
 class ConnectionService:
     """Service for managing database connections."""
     
+    # Validation verdict cache: {pool_key: (checked_at_monotonic, is_valid)}
+    # Collapses bursts of concurrent status/health checks into one SELECT 1.
+    ALIVE_BYPASS_WINDOW = 1.0      # seconds to trust a successful validation
+    FAILURE_BYPASS_WINDOW = 0.25   # shorter, so a bad verdict isn't pinned
+    _validation_cache: dict = {}
+    _validation_locks: dict = {}
+    _validation_lock = threading.RLock()
+    
+    @staticmethod
+    def _cached_verdict(key: str):
+        """Return the cached verdict for key if still inside its window, else None."""
+        cached = ConnectionService._validation_cache.get(key)
+        if cached is None:
+            return None
+        checked_at, is_valid = cached
+        window = (ConnectionService.ALIVE_BYPASS_WINDOW if is_valid
+                  else ConnectionService.FAILURE_BYPASS_WINDOW)
+        if time.monotonic() - checked_at < window:
+            return is_valid
+        return None
+    
+    @staticmethod
+    def _verify_db_connection(db_config: dict) -> bool:
+        """
+        Validate the pooled connection for db_config, reusing a recent verdict.
+        
+        Pool errors raised by the connection manager are not cached so the
+        caller always sees the real failure.
+        """
+        from database.connection_manager import get_connection_manager
+        from database.adapters import get_adapter
+        
+        manager = get_connection_manager()
+        key = manager.get_pool_key(db_config)
+        
+        with ConnectionService._validation_lock:
+            verdict = ConnectionService._cached_verdict(key)
+            if verdict is not None:
+                return verdict
+            key_lock = ConnectionService._validation_locks.setdefault(key, threading.RLock())
+        
+        # Concurrent callers for the same config wait here for one verdict
+        # instead of each racing its own round trip to the database.
+        with key_lock:
+            with ConnectionService._validation_lock:
+                verdict = ConnectionService._cached_verdict(key)
+            if verdict is not None:
+                return verdict
+            
+            adapter = get_adapter(db_config.get('db_type', 'mysql'))
+            conn = manager.get_connection(db_config)
+            try:
+                is_valid = adapter.validate_connection(conn)
+            finally:
+                manager.release_connection(db_config, conn)
+            
+            with ConnectionService._validation_lock:
+                ConnectionService._validation_cache[key] = (time.monotonic(), is_valid)
+            return is_valid
+    
+    @staticmethod
+    def invalidate_validation_cache(db_config: dict = None) -> None:
+        """Forget cached validation verdicts (all, or for one config)."""
+        with ConnectionService._validation_lock:
+            if db_config is None:
+                ConnectionService._validation_cache.clear()
+                ConnectionService._validation_locks.clear()
+                return
+            from database.connection_manager import get_connection_manager
+            key = get_connection_manager().get_pool_key(db_config)
+            ConnectionService._validation_cache.pop(key, None)
+            ConnectionService._validation_locks.pop(key, None)
+    
     @staticmethod
     def connect_database(connection_params: dict, user_id: str = None) -> dict:
         """
@@ -100,15 +175,8 @@ class ConnectionService:
             }
         
         try:
-            from database.connection_manager import get_connection_manager
-            from database.adapters import get_adapter
-            
             db_type = db_config.get('db_type', 'mysql')
-            manager = get_connection_manager()
-            adapter = get_adapter(db_type)
-            
-            conn = manager.get_connection(db_config)
-            is_valid = adapter.validate_connection(conn)
+            is_valid = ConnectionService._verify_db_connection(db_config)
             
             if is_valid:
                 return {
@@ -147,15 +215,7 @@ class ConnectionService:
             return {'status': 'error', 'connected': False}
         
         try:
-            from database.connection_manager import get_connection_manager
-            from database.adapters import get_adapter
-            
-            db_type = db_config.get('db_type', 'mysql')
-            manager = get_connection_manager()
-            adapter = get_adapter(db_type)
-            
-            conn = manager.get_connection(db_config)
-            is_valid = adapter.validate_connection(conn)
+            is_valid = ConnectionService._verify_db_connection(db_config)
             
             return {'status': 'success', 'connected': is_valid}
         except Exception as e:
@@ -4,17 +4,72 @@ Context Service - Pure FastAPI Version
 Manages persistent AI context in Firestore.
 Provides schema caching, connection state, and query history.
 No Flask dependencies - context validation is done by caller.
+
+Fully type-annotated so it can be compiled with mypyc
+(`mypyc services/context_service.py`); the interpreted module is used
+whenever no compiled extension is present.
 """
 
+import asyncio
 import hashlib
+import heapq
 import json
 import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from itertools import islice
+from operator import attrgetter
+from typing import Any, ClassVar, Dict, Iterable, List, Optional
+
+from config import Config
 
 logger = logging.getLogger(__name__)
 
 
+def _firestore_configured() -> bool:
+    """True when Firebase credentials are present in the environment."""
+    try:
+        Config.get_firebase_credentials()
+        return True
+    except ValueError:
+        return False
+
+
+@dataclass(slots=True, frozen=True)
+class SchemaSummaryEntry:
+    """One cached schema in the UI summary."""
+    database: str
+    table_count: int
+    cached_at: str
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass(slots=True, frozen=True)
+class FullContext:
+    """Complete AI context snapshot for a user."""
+    connection: Dict
+    schemas: Dict
+    recent_queries: List[Dict]
+    updated_at: Any = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'connection': self.connection,
+            'schemas': self.schemas,
+            'recent_queries': self.recent_queries,
+            'updated_at': self.updated_at
+        }
+
+
+_get_cached_at = attrgetter('cached_at')
+
+
 class ContextService:
     """
     Manages AI context in Firestore.
@@ -26,23 +81,46 @@ class ContextService:
             └── recent_queries
     """
     
-    COLLECTION_NAME = 'user_context'
-    MAX_RECENT_QUERIES = 10
-    SCHEMA_CACHE_TTL_SECONDS = 300  # 5 minutes TTL for schema cache
-    CONNECTION_TTL_SECONDS = 300  # 5 minutes - after this, verify connection
+    COLLECTION_NAME: ClassVar[str] = 'user_context'
+    MAX_RECENT_QUERIES: ClassVar[int] = 10
+    SCHEMA_CACHE_TTL_SECONDS: ClassVar[int] = 300  # 5 minutes TTL for schema cache
+    CONNECTION_TTL_SECONDS: ClassVar[int] = 300  # 5 minutes - after this, verify connection
+    WRITE_DEBOUNCE_SECONDS: ClassVar[float] = 0.03  # Coalesce writes issued within this window
+    QUERY_LOG_FLUSH_SECONDS: ClassVar[float] = 0.1  # Coalesce bursts of logged queries
+    
+    # Checked once at import: without credentials every write is a no-op
+    # instead of failing inside Firestore client initialization.
+    ENABLED: ClassVar[bool] = _firestore_configured()
+    
+    # Pending merge patches per user, flushed as one set(merge=True)
+    _pending_writes: ClassVar[Dict[str, Dict[str, Any]]] = {}
+    _pending_queries: ClassVar[Dict[str, List[Dict[str, Any]]]] = {}
+    _pending_due: ClassVar[Dict[str, float]] = {}  # key -> monotonic flush deadline
+    _write_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    # One background flusher serves every user; it sleeps until the earliest
+    # deadline and commits everything due in a single batch
+    _flush_wakeup: ClassVar[threading.Condition] = threading.Condition(_write_lock)
+    _flusher: ClassVar[Optional[threading.Thread]] = None
+    
+    # Serialize flushes per user (background, read-triggered and shutdown flushes
+    # can overlap), so the recent_queries read-modify-write never interleaves.
+    # Striped by key hash to keep the lock count fixed.
+    _FLUSH_LOCK_STRIPES: ClassVar[int] = 64
+    _flush_locks: ClassVar[List[threading.Lock]] = [threading.Lock() for _ in range(_FLUSH_LOCK_STRIPES)]
     
     # =========================================================================
     # Firestore Access (delegated to repository)
     # =========================================================================
     
     @staticmethod
-    def _normalize_user_id(user_id) -> str:
+    def _normalize_user_id(user_id: Any) -> str:
         """Normalize user_id to string for Firestore document ID."""
         from repositories import ContextRepository
         return ContextRepository._normalize_user_id(user_id)
     
     @staticmethod
-    def _get_context_ref(user_id):
+    def _get_context_ref(user_id: Any) -> Any:
         """Get Firestore document reference for user context."""
         from repositories import ContextRepository
         return ContextRepository.get_ref(user_id)
@@ -51,13 +129,193 @@ class ContextService:
     def _get_context(user_id: str) -> Dict:
         """Get full context document, or empty dict if not exists."""
         from repositories import ContextRepository
+        # Reads must see this process's own buffered writes
+        ContextService.flush_writes(user_id)
         return ContextRepository.get(user_id)
     
     @staticmethod
-    def _update_context(user_id: str, data: Dict) -> bool:
-        """Update context document with merge."""
+    def _patch_context(user_id: str, patch: Dict) -> bool:
+        """
+        Targeted field update via update() for documents known to exist.
+        
+        Keys are field paths (see ContextRepository.field_path). Buffered
+        writes are flushed first so ordering is preserved.
+        """
+        from repositories import ContextRepository
+        ContextService.flush_writes(user_id)
+        return ContextRepository.patch(user_id, patch)
+    
+    @staticmethod
+    def _upsert_context(user_id: str, data: Dict, sync: bool = False) -> Optional[bool]:
+        """
+        Create-or-update context document with merge.
+        
+        Writes are buffered for WRITE_DEBOUNCE_SECONDS so back-to-back updates
+        from one user action become a single Firestore round trip. Pass
+        sync=True to write immediately and get the real result.
+        
+        Returns:
+            True/False for a sync write; None when the write was queued
+            (a failed background flush is logged, not reported here)
+        """
+        if sync:
+            from repositories import ContextRepository
+            ContextService.flush_writes(user_id)
+            return ContextRepository.update(user_id, data)
+        
+        ContextService._enqueue_write(user_id, data)
+        return None
+    
+    # =========================================================================
+    # Write Coalescing
+    # =========================================================================
+    
+    @staticmethod
+    def _merge_patch(target: Dict, patch: Dict) -> None:
+        """Deep-merge patch into target, mirroring Firestore set(merge=True)."""
+        for key, value in patch.items():
+            if isinstance(value, dict):
+                existing = target.get(key)
+                if not isinstance(existing, dict):
+                    existing = target[key] = {}
+                ContextService._merge_patch(existing, value)
+            else:
+                target[key] = value
+    
+    @staticmethod
+    def _enqueue_write(user_id: str, patch: Dict) -> None:
+        """Merge patch into the user's pending write and schedule a flush."""
+        key = ContextService._normalize_user_id(user_id)
+        with ContextService._write_lock:
+            pending = ContextService._pending_writes.setdefault(key, {})
+            ContextService._merge_patch(pending, patch)
+            ContextService._schedule_flush(key, ContextService.WRITE_DEBOUNCE_SECONDS)
+    
+    @staticmethod
+    def _enqueue_query(user_id: str, entry: Dict) -> None:
+        """Buffer a recent_queries entry; a burst is appended in one write."""
+        key = ContextService._normalize_user_id(user_id)
+        with ContextService._write_lock:
+            ContextService._pending_queries.setdefault(key, []).append(entry)
+            ContextService._schedule_flush(key, ContextService.QUERY_LOG_FLUSH_SECONDS)
+    
+    @staticmethod
+    def _schedule_flush(key: str, delay: float) -> None:
+        """Set the user's flush deadline if none is pending (caller holds _write_lock)."""
+        if key in ContextService._pending_due:
+            return
+        ContextService._pending_due[key] = time.monotonic() + delay
+        if ContextService._flusher is None:
+            ContextService._flusher = threading.Thread(
+                target=ContextService._flush_loop, name='context-flush', daemon=True
+            )
+            ContextService._flusher.start()
+        ContextService._flush_wakeup.notify()
+    
+    @staticmethod
+    def _flush_loop() -> None:
+        """Background flusher: wait for the earliest deadline, flush what's due."""
+        while True:
+            with ContextService._write_lock:
+                while True:
+                    now = time.monotonic()
+                    due = [key for key, deadline in ContextService._pending_due.items() if deadline <= now]
+                    if due:
+                        break
+                    timeout = (
+                        min(ContextService._pending_due.values()) - now
+                        if ContextService._pending_due else None
+                    )
+                    ContextService._flush_wakeup.wait(timeout)
+            try:
+                ContextService._flush_keys(due)
+            except Exception as e:
+                logger.error(f"Background context flush failed: {e}")
+    
+    @staticmethod
+    def _flush_lock(key: str) -> threading.Lock:
+        """The flush lock stripe guarding key."""
+        return ContextService._flush_locks[hash(key) % ContextService._FLUSH_LOCK_STRIPES]
+    
+    @staticmethod
+    def _take_pending(key: str) -> Optional[Dict]:
+        """
+        Pop the user's buffered patch and queries, merged into one patch.
+        
+        Caller holds the key's flush lock. If the stored recent_queries
+        can't be read, the buffered queries are dropped rather than
+        overwriting the stored history with only the new entries.
+        """
+        with ContextService._write_lock:
+            pending = ContextService._pending_writes.pop(key, None)
+            queries = ContextService._pending_queries.pop(key, None)
+            ContextService._pending_due.pop(key, None)
+        
+        if queries:
+            from repositories import ContextRepository
+            # recent_queries is a capped array, so appending needs the current one
+            if pending and 'recent_queries' in pending:
+                current = pending['recent_queries']
+            else:
+                current = ContextRepository.get_recent_queries(key)
+            if current is None:
+                logger.warning(f"Dropping {len(queries)} query log entries for {key}: history read failed")
+            else:
+                recent = deque(current, maxlen=ContextService.MAX_RECENT_QUERIES)
+                recent.extend(queries)
+                pending = pending or {}
+                pending['recent_queries'] = list(recent)
+        return pending
+    
+    @staticmethod
+    def flush_writes(user_id: str) -> bool:
+        """Write out any buffered patch for user_id now. Returns the write result."""
+        key = ContextService._normalize_user_id(user_id)
+        with ContextService._flush_lock(key):
+            pending = ContextService._take_pending(key)
+            if not pending:
+                return True
+            
+            from repositories import ContextRepository
+            return ContextRepository.update(key, pending)
+    
+    @staticmethod
+    def flush_all_writes() -> None:
+        """Flush every buffered write in batched commits (used at shutdown)."""
+        with ContextService._write_lock:
+            keys = set(ContextService._pending_writes) | set(ContextService._pending_queries)
+        ContextService._flush_keys(keys)
+    
+    @staticmethod
+    def _flush_keys(keys: Iterable[str]) -> None:
+        """Write several users' buffered patches in batched commits."""
         from repositories import ContextRepository
-        return ContextRepository.update(user_id, data)
+        
+        # Hold every affected stripe (in index order, so no lock-order
+        # inversion) until the batch is committed
+        stripes = sorted({hash(key) % ContextService._FLUSH_LOCK_STRIPES for key in keys})
+        with ExitStack() as stack:
+            for index in stripes:
+                stack.enter_context(ContextService._flush_locks[index])
+            updates: Dict[str, Dict[str, Any]] = {}
+            for key in keys:
+                pending = ContextService._take_pending(key)
+                if pending:
+                    updates[key] = pending
+            if updates and not ContextRepository.update_many(updates):
+                logger.error(
+                    f"Deferred context writes failed for {len(updates)} user(s): "
+                    f"{', '.join(sorted(updates))}"
+                )
+    
+    @staticmethod
+    def _discard_writes(user_id: str) -> None:
+        """Drop any buffered patch for user_id without writing it."""
+        key = ContextService._normalize_user_id(user_id)
+        with ContextService._write_lock:
+            ContextService._pending_writes.pop(key, None)
+            ContextService._pending_queries.pop(key, None)
+            ContextService._pending_due.pop(key, None)
     
     # =========================================================================
     # Connection State Management
@@ -65,7 +323,7 @@ class ContextService:
     
     @staticmethod
     def set_connection(user_id: str, db_type: str, database: str, 
-                       host: str, is_remote: bool, schema: str = 'public') -> bool:
+                       host: str, is_remote: bool, schema: str = 'public') -> Optional[bool]:
         """
         Set current connection state.
         
@@ -76,24 +334,65 @@ class ContextService:
             host: Host address
             is_remote: Whether it's a remote connection
             schema: PostgreSQL schema (default 'public')
+            
+        Returns:
+            None once queued (see _upsert_context), False if context is disabled
         """
+        if not ContextService.ENABLED:
+            return False
         connection_data = {
-            'current_connection': {
-                'connected': True,
-                'db_type': db_type,
-                'database': database,
-                'host': host,
-                'is_remote': is_remote,
-                'schema': schema,
-                'connected_at': datetime.now().isoformat()
-            }
+            'current_connection': ContextService._connection_state(
+                db_type, database, host, is_remote, schema
+            )
         }
         logger.info(f"Setting connection context for user {user_id}: {db_type}/{database}")
-        return ContextService._update_context(user_id, connection_data)
+        return ContextService._upsert_context(user_id, connection_data)
+    
+    @staticmethod
+    def set_connection_and_cache_schema(user_id: str, db_type: str, database: str,
+                                        host: str, is_remote: bool, tables: List[str],
+                                        columns: Dict[str, List], schema: str = 'public') -> bool:
+        """
+        Set current connection state and cache its schema in a single write.
+        
+        Equivalent to set_connection() followed by cache_schema(), but one
+        Firestore round trip instead of two (used on connect / DB switch).
+        """
+        if not ContextService.ENABLED:
+            return False
+        from repositories import ContextRepository
+        
+        logger.info(
+            f"Setting connection context and caching schema for user {user_id}: "
+            f"{db_type}/{database} ({len(tables)} tables)"
+        )
+        return ContextService._patch_context(user_id, {
+            'current_connection': ContextService._connection_state(
+                db_type, database, host, is_remote, schema
+            ),
+            ContextRepository.field_path('database_schemas', database):
+                ContextService._schema_entry(tables, columns)
+        })
     
     @staticmethod
-    def clear_connection(user_id: str) -> bool:
-        """Clear current connection state (user disconnected)."""
+    def _connection_state(db_type: str, database: str, host: str,
+                          is_remote: bool, schema: str) -> Dict:
+        """Build the current_connection map for a connected database."""
+        return {
+            'connected': True,
+            'db_type': db_type,
+            'database': database,
+            'host': host,
+            'is_remote': is_remote,
+            'schema': schema,
+            'connected_at': datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def clear_connection(user_id: str) -> Optional[bool]:
+        """Clear current connection state (user disconnected). None once queued."""
+        if not ContextService.ENABLED:
+            return False
         connection_data = {
             'current_connection': {
                 'connected': False,
@@ -106,7 +405,7 @@ class ContextService:
             }
         }
         logger.info(f"Clearing connection context for user {user_id}")
-        return ContextService._update_context(user_id, connection_data)
+        return ContextService._upsert_context(user_id, connection_data)
     
     @staticmethod
     def get_connection(user_id: str) -> Dict:
@@ -126,12 +425,12 @@ class ContextService:
         return context.get('current_connection', {'connected': False})
     
     @staticmethod
-    def update_schema(user_id: str, schema_name: str) -> bool:
-        """Update current schema (PostgreSQL)."""
-        context = ContextService._get_context(user_id)
-        connection = context.get('current_connection', {})
-        connection['schema'] = schema_name
-        return ContextService._update_context(user_id, {'current_connection': connection})
+    def update_schema(user_id: str, schema_name: str) -> Optional[bool]:
+        """Update current schema (PostgreSQL). Buffered; None once queued."""
+        if not ContextService.ENABLED:
+            return False
+        # Nested maps deep-merge, so only current_connection.schema changes
+        return ContextService._upsert_context(user_id, {'current_connection': {'schema': schema_name}})
     
     # =========================================================================
     # Schema Caching
@@ -146,6 +445,14 @@ class ContextService:
         }, sort_keys=True)
         return hashlib.md5(schema_str.encode()).hexdigest()
     
+    @staticmethod
+    def compute_schema_size(tables: List[str], columns: Dict[str, List]) -> List[int]:
+        """Cheap size fingerprint: [table_count, total_column_count]."""
+        return [
+            len(tables),
+            sum(len(v) if isinstance(v, list) else 1 for v in columns.values())
+        ]
+    
     @staticmethod
     def get_cached_schema(user_id: str, database: str) -> Optional[Dict]:
         """
@@ -160,7 +467,15 @@ class ContextService:
         if not cached:
             return None
         
-        # Check TTL
+        # Check TTL - prefer the epoch timestamp, fall back to ISO for older entries
+        cached_at_epoch = cached.get('cached_at_epoch')
+        if cached_at_epoch is not None:
+            age_seconds = time.time() - cached_at_epoch
+            if age_seconds > ContextService.SCHEMA_CACHE_TTL_SECONDS:
+                logger.debug(f"Schema cache expired for {database} (age: {age_seconds:.0f}s)")
+                return None
+            return cached
+        
         cached_at = cached.get('cached_at')
         if cached_at:
             try:
@@ -182,19 +497,27 @@ class ContextService:
     def cache_schema(user_id: str, database: str, tables: List[str], 
                      columns: Dict[str, List]) -> bool:
         """Cache schema for a database."""
-        schema_data = {
+        if not ContextService.ENABLED:
+            return False
+        from repositories import ContextRepository
+        
+        logger.info(f"Caching schema for user {user_id}, database {database}: {len(tables)} tables")
+        return ContextService._patch_context(user_id, {
+            ContextRepository.field_path('database_schemas', database):
+                ContextService._schema_entry(tables, columns)
+        })
+    
+    @staticmethod
+    def _schema_entry(tables: List[str], columns: Dict[str, List]) -> Dict:
+        """Build the cached schema map for one database."""
+        return {
             'tables': tables,
             'columns': columns,
             'schema_hash': ContextService.compute_schema_hash(tables, columns),
-            'cached_at': datetime.now().isoformat()
+            'schema_size': ContextService.compute_schema_size(tables, columns),
+            'cached_at': datetime.now().isoformat(),
+            'cached_at_epoch': time.time()  # Used for TTL math (survives restarts)
         }
-        
-        context = ContextService._get_context(user_id)
-        schemas = context.get('database_schemas', {})
-        schemas[database] = schema_data
-        
-        logger.info(f"Caching schema for user {user_id}, database {database}: {len(tables)} tables")
-        return ContextService._update_context(user_id, {'database_schemas': schemas})
     
     @staticmethod
     def is_schema_changed(user_id: str, database: str, 
@@ -204,6 +527,13 @@ class ContextService:
         if not cached:
             return True
         
+        # Size mismatch means a change; only hash when sizes agree
+        cached_size = cached.get('schema_size')
+        if cached_size is not None:
+            current_size = ContextService.compute_schema_size(current_tables, current_columns)
+            if list(cached_size) != current_size:
+                return True
+        
         current_hash = ContextService.compute_schema_hash(current_tables, current_columns)
         return cached.get('schema_hash') != current_hash
     
@@ -212,27 +542,39 @@ class ContextService:
         """Invalidate schema cache for a database."""
         from repositories import ContextRepository
         
-        success = ContextRepository.delete_field(user_id, f'database_schemas.{database}')
+        ContextService.flush_writes(user_id)
+        success = ContextRepository.delete_field(
+            user_id, ContextRepository.field_path('database_schemas', database)
+        )
         if success:
             logger.info(f"Invalidated schema cache for {database}")
         return success
     
     @staticmethod
-    def get_schema_summary(user_id: str) -> List[Dict]:
-        """Get summary of cached schemas for UI display."""
+    def get_schema_summary(user_id: str, limit: Optional[int] = None) -> List[SchemaSummaryEntry]:
+        """
+        Get summary of cached schemas for UI display, most recent first.
+        
+        Args:
+            user_id: User ID
+            limit: Max entries to return (default: all)
+        """
         context = ContextService._get_context(user_id)
         schemas = context.get('database_schemas', {})
         
-        summary = []
-        for db_name, schema_data in schemas.items():
-            summary.append({
-                'database': db_name,
-                'table_count': len(schema_data.get('tables', [])),
-                'cached_at': schema_data.get('cached_at')
-            })
+        # Missing cached_at is coerced to '' here so the sort key stays a plain attrgetter
+        summary = [
+            SchemaSummaryEntry(
+                database=db_name,
+                table_count=len(schema_data.get('tables', [])),
+                cached_at=schema_data.get('cached_at') or ''
+            )
+            for db_name, schema_data in schemas.items()
+        ]
         
-        summary.sort(key=lambda x: x.get('cached_at') or '', reverse=True)
-        return summary
+        if limit is None:
+            limit = len(summary)
+        return heapq.nlargest(limit, summary, key=_get_cached_at)
     
     @staticmethod
     def get_all_cached_schemas(user_id: str) -> Dict:
@@ -248,53 +590,76 @@ class ContextService:
     def add_query(user_id: str, query: str, database: str, 
                   row_count: int = 0, status: str = 'success') -> bool:
         """Add a query to recent history."""
+        if not ContextService.ENABLED:
+            return False
         query_entry = {
-            'query': query[:500],  # Truncate long queries
+            'query': query if len(query) <= 500 else query[:500],  # Truncate long queries
             'database': database,
             'row_count': row_count,
             'status': status,
             'executed_at': datetime.now().isoformat()
         }
         
-        context = ContextService._get_context(user_id)
-        queries = context.get('recent_queries', [])
-        queries.append(query_entry)
-        queries = queries[-ContextService.MAX_RECENT_QUERIES:]
-        
-        return ContextService._update_context(user_id, {'recent_queries': queries})
+        # Buffered: a burst of queries costs one read + one write at flush
+        ContextService._enqueue_query(user_id, query_entry)
+        return True
     
     @staticmethod
     def get_recent_queries(user_id: str, limit: int = 10) -> List[Dict]:
         """Get recent queries for user."""
         context = ContextService._get_context(user_id)
         queries = context.get('recent_queries', [])
-        return queries[-limit:]
+        count = len(queries)
+        return list(islice(queries, max(0, count - limit), count))
     
     @staticmethod
     def clear_query_history(user_id: str) -> bool:
         """Clear query history."""
-        return ContextService._update_context(user_id, {'recent_queries': []})
+        return ContextService._patch_context(user_id, {'recent_queries': []})
     
     # =========================================================================
     # Full Context for AI
     # =========================================================================
     
     @staticmethod
-    def get_full_context(user_id: str) -> Dict:
+    def get_full_context(user_id: str) -> FullContext:
         """Get complete context for AI tools."""
         context = ContextService._get_context(user_id)
         
-        return {
-            'connection': context.get('current_connection', {'connected': False}),
-            'schemas': context.get('database_schemas', {}),
-            'recent_queries': context.get('recent_queries', []),
-            'updated_at': context.get('updated_at')
-        }
+        return FullContext(
+            connection=context.get('current_connection', {'connected': False}),
+            schemas=context.get('database_schemas', {}),
+            recent_queries=context.get('recent_queries', []),
+            updated_at=context.get('updated_at')
+        )
+    
+    @staticmethod
+    async def get_full_context_async(user_id: str) -> FullContext:
+        """
+        Async variant of get_full_context for route handlers.
+        
+        Reads through the async Firestore client instead of occupying a
+        threadpool worker; further independent reads can be gathered here.
+        """
+        from repositories import ContextRepository
+        
+        key = ContextService._normalize_user_id(user_id)
+        if key in ContextService._pending_writes or key in ContextService._pending_queries:
+            await asyncio.to_thread(ContextService.flush_writes, key)
+        
+        context = await ContextRepository.get_async(user_id)
+        return FullContext(
+            connection=context.get('current_connection', {'connected': False}),
+            schemas=context.get('database_schemas', {}),
+            recent_queries=context.get('recent_queries', []),
+            updated_at=context.get('updated_at')
+        )
     
     @staticmethod
     def clear_all_context(user_id: str) -> bool:
         """Clear all context for user."""
         from repositories import ContextRepository
+        ContextService._discard_writes(user_id)
         return ContextRepository.delete(user_id)
     
     # =========================================================================
@@ -305,8 +670,9 @@ class ContextService:
     def set_user_preference(user_id: str, key: str, value: Any) -> bool:
         """Set a user preference."""
         try:
-            return ContextService._update_context(user_id, {
-                f'preferences.{key}': value
+            from repositories import ContextRepository
+            return ContextService._patch_context(user_id, {
+                ContextRepository.field_path('preferences', key): value
             })
         except Exception as e:
             logger.error(f"Error setting preference {key} for user {user_id}: {e}")
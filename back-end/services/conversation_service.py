@@ -5,13 +5,377 @@ Handles conversation management, AI streaming responses, and Firestore persisten
 No Flask dependencies.
 """
 
+import asyncio
+import io
 import uuid
 import logging
 import re
-from typing import Optional, Generator
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from functools import partial
+from typing import Optional, Generator, AsyncGenerator
+
+from database.connection_manager import get_connection_manager
+from repositories import ConversationRepository
+from services import shared_cache
+from services.llm import LLMService, ToolMarker
 
 logger = logging.getLogger(__name__)
 
+_TOOL_STATUSES = frozenset({'running', 'done'})
+
+
+def _json_object_end(text: str) -> int:
+    """
+    Return the index just past the JSON object that opens `text`, or -1.
+    
+    Counts brace depth and skips string contents (with escapes), so braces
+    or ':' inside argument values (e.g. SQL) can't end the object early.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+def _parse_tool_marker(chunk: str) -> Optional[tuple]:
+    """
+    Split a [[TOOL:name:status:args:result]] marker into its four fields.
+    
+    Args and result are JSON objects or 'null'. Structural parsing instead of
+    a regex: no backtracking over large result payloads, the args object is
+    delimited by brace depth (only the small args blob is scanned), and the
+    marker is closed at its last ']]' so nested arrays in the result survive.
+    
+    Returns:
+        (name, status, args, result) or None if the chunk is not a full marker
+    """
+    end = chunk.rfind(']]')
+    if not chunk.startswith('[[TOOL:') or end < 7:
+        return None
+    parts = chunk[7:end].split(':', 2)  # after '[[TOOL:'
+    if len(parts) != 3:
+        return None
+    name, status, payload = parts
+    if status not in _TOOL_STATUSES or not name:
+        return None
+    
+    if payload.startswith('null:'):
+        args, result = 'null', payload[5:]
+    elif payload[:1] == '{':
+        args_end = _json_object_end(payload)
+        if args_end < 0 or payload[args_end:args_end + 1] != ':':
+            return None
+        args, result = payload[:args_end], payload[args_end + 1:]
+    else:
+        return None
+    if result != 'null' and not (result[:1] == '{' and result[-1:] == '}'):
+        return None
+    return name, status, args, result
+
+
+# Error classification in one case-insensitive search (no lower() copy).
+# Group 1: rate limit, anywhere in the text (anchored lookahead, so it wins
+# over an earlier auth keyword). Group 2: authentication.
+_ERROR_CLASSIFY_RE = re.compile(
+    r'^(?=[\s\S]*?(rate_limit|quota|429))|(authentication|401)', re.IGNORECASE
+)
+_QUOTA_KEYS = ('quota', '429', 'rate')
+
+
+# =============================================================================
+# HISTORY CACHE
+# =============================================================================
+# Process-local TTL/LRU cache of formatted LLM history per conversation, so warm
+# conversations skip the Firestore read at the start of each turn. Entries are
+# kept as LLM chat messages ({"role", "content"}) and extended in place as
+# messages are stored, so the format conversion runs once per message rather
+# than once per turn and PromptBuilder can use the entries as they are.
+# The window is trimmed in blocks rather than sliding by one message, so most
+# turns send the previous turn's prompt unchanged as a prefix (a provider-side
+# prefix cache hit) instead of shifting it every turn. When Redis is configured
+# the window lives there instead (services.shared_cache), so every worker
+# process reads and extends the same copy.
+
+HISTORY_WINDOW = 20  # Minimum messages of context sent to the LLM
+HISTORY_TRIM_SLACK = 10  # Grow this far past the window before trimming back
+HISTORY_CACHE_TTL_SECONDS = 300
+HISTORY_CACHE_MAX_ENTRIES = 10_000
+
+_history_cache: "OrderedDict[str, tuple[float, list]]" = OrderedDict()
+_history_lock = threading.Lock()
+
+
+_HISTORY_ROLES = {"user": "user"}  # Any other sender is the assistant
+
+
+def _format_history_entry(sender: str, content: str) -> dict:
+    """Convert a stored message into the LLM history format."""
+    return {"role": _HISTORY_ROLES.get(sender, "assistant"), "content": content}
+
+
+def _get_cached_history(conversation_id: str) -> Optional[list]:
+    """Return a copy of the cached history, or None on miss/expiry."""
+    client = shared_cache.get_shared_redis()
+    if client is not None:
+        return shared_cache.get_history(client, conversation_id)
+    with _history_lock:
+        entry = _history_cache.get(conversation_id)
+        if entry is None:
+            return None
+        cached_at, history = entry
+        if time.monotonic() - cached_at > HISTORY_CACHE_TTL_SECONDS:
+            del _history_cache[conversation_id]
+            return None
+        _history_cache.move_to_end(conversation_id)
+        return list(history)
+
+
+def _cache_history(conversation_id: str, history: list) -> None:
+    """Store formatted history (last HISTORY_WINDOW entries), evicting LRU entries."""
+    window = history[-HISTORY_WINDOW:]
+    client = shared_cache.get_shared_redis()
+    if client is not None:
+        shared_cache.set_history(client, conversation_id, window, HISTORY_CACHE_TTL_SECONDS)
+        return
+    with _history_lock:
+        _history_cache[conversation_id] = (time.monotonic(), window)
+        _history_cache.move_to_end(conversation_id)
+        while len(_history_cache) > HISTORY_CACHE_MAX_ENTRIES:
+            _history_cache.popitem(last=False)
+
+
+def _append_cached_history(conversation_id: str, message_data: Optional[dict]) -> None:
+    """Append a just-stored message to the cached history (if cached)."""
+    if not message_data:
+        return
+    formatted = _format_history_entry(message_data['sender'], message_data['content'])
+    client = shared_cache.get_shared_redis()
+    if client is not None:
+        shared_cache.append_history(
+            client, conversation_id, formatted, HISTORY_CACHE_TTL_SECONDS,
+            HISTORY_WINDOW, HISTORY_WINDOW + HISTORY_TRIM_SLACK
+        )
+        return
+    with _history_lock:
+        entry = _history_cache.get(conversation_id)
+        if entry is None:
+            return
+        history = entry[1]
+        history.append(formatted)
+        if len(history) > HISTORY_WINDOW + HISTORY_TRIM_SLACK:
+            del history[:-HISTORY_WINDOW]
+        # Written through, so still authoritative - extend its TTL
+        _history_cache[conversation_id] = (time.monotonic(), history)
+
+
+def _invalidate_cached_history(conversation_id: str) -> None:
+    """Drop cached history for a conversation."""
+    client = shared_cache.get_shared_redis()
+    if client is not None:
+        shared_cache.delete_history(client, conversation_id)
+        return
+    with _history_lock:
+        _history_cache.pop(conversation_id, None)
+
+
+def _load_history(conversation_id: str) -> list:
+    """Fetch a conversation from Firestore, format its tail as history and cache it."""
+    recent_messages = ConversationRepository.get_tail(conversation_id, HISTORY_WINDOW)
+    roles_get = _HISTORY_ROLES.get
+    history = [
+        {"role": roles_get(msg["sender"], "assistant"), "content": msg["content"]}
+        for msg in recent_messages
+    ]
+    if history:
+        logger.debug("Loaded %d messages for context", len(history))
+    _cache_history(conversation_id, history)
+    return history
+
+
+# =============================================================================
+# BACKGROUND FIRESTORE I/O
+# =============================================================================
+# Each turn's prompt and response are written together, off the streaming
+# thread, once the stream ends. The generator does not wait for the write;
+# the next turn (or a delete) of the same conversation waits on it instead,
+# so history never misses the previous turn. History reads use a separate
+# pool so they never queue behind writes.
+
+WRITE_RETRY_ATTEMPTS = 3
+WRITE_RETRY_BACKOFF_SECONDS = 0.2
+WRITE_TIMEOUT_SECONDS = 5
+
+_write_executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix='conversation-write')
+_io_executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix='conversation-read')
+
+_pending_turns: "dict[str, Future]" = {}  # conversation_id -> in-flight turn write
+_pending_lock = threading.Lock()
+
+
+def _store_turn_with_retry(conversation_id: str, prompt: str, response_text: Optional[str],
+                          user_id: str, tools: list = None, turn_id: str = None,
+                          thinking: str = None) -> list:
+    """Store a prompt/response pair in one write (retrying with backoff) and update the history cache."""
+    # Fixed ID and timestamp make every attempt write identical messages, so a
+    # retry after an unacknowledged-but-applied write is a no-op (ArrayUnion)
+    turn_id = turn_id or f"{conversation_id}_{int(time.time() * 1000)}"
+    timestamp = datetime.now()
+    for attempt in range(WRITE_RETRY_ATTEMPTS):
+        try:
+            stored = ConversationRepository.store_message_pair(
+                conversation_id, prompt, response_text, user_id, tools=tools,
+                turn_id=turn_id, timestamp=timestamp, thinking=thinking
+            )
+            for message_data in stored:
+                _append_cached_history(conversation_id, message_data)
+            return stored
+        except Exception as e:
+            if attempt == WRITE_RETRY_ATTEMPTS - 1:
+                raise
+            delay = WRITE_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            logger.warning(f"Store turn failed for {conversation_id} (retrying in {delay:.1f}s): {e}")
+            time.sleep(delay)
+
+
+def _prefetch_db_pool(db_config: dict) -> None:
+    """Warm the DB pool while the model is reasoning (best effort, errors ignored)."""
+    try:
+        get_connection_manager().ensure_pool(db_config)
+    except Exception as e:
+        logger.debug("DB pool prefetch skipped: %s", e)
+
+
+def _submit_turn(conversation_id: str, prompt: str, response_text: Optional[str],
+                 user_id: str, tools: list = None, thinking: str = None,
+                 label: str = "complete") -> Future:
+    """Queue a turn write without waiting; failures are logged by the done-callback."""
+    future = _write_executor.submit(
+        _store_turn_with_retry, conversation_id, prompt, response_text, user_id, tools,
+        thinking=thinking
+    )
+    with _pending_lock:
+        _pending_turns[conversation_id] = future
+    future.add_done_callback(partial(_on_turn_stored, conversation_id, label))
+    return future
+
+
+def _on_turn_stored(conversation_id: str, label: str, future: Future) -> None:
+    """Done-callback for _submit_turn: drop the pending entry and log the outcome."""
+    with _pending_lock:
+        if _pending_turns.get(conversation_id) is future:
+            del _pending_turns[conversation_id]
+    
+    err = future.exception()
+    if err is not None:
+        logger.error(f"Failed to store conversation turn for {conversation_id}: {err}")
+        return
+    stored = future.result()
+    if len(stored) > 1:
+        logger.info(f"Stored AI response ({label}): {len(stored[-1]['content'])} chars")
+
+
+def _wait_for_pending_turn(conversation_id: str, timeout: float = WRITE_TIMEOUT_SECONDS) -> None:
+    """Block until the conversation's in-flight turn write (if any) has finished."""
+    with _pending_lock:
+        future = _pending_turns.get(conversation_id)
+    if future is None:
+        return
+    try:
+        future.result(timeout=timeout)
+    except Exception:
+        pass  # Already logged by _on_turn_stored (or still running past the timeout)
+
+
+class ChunkKind(Enum):
+    """Kind of a streamed chunk, decided once on arrival."""
+    TEXT = 'text'          # Plain response text
+    TOOL = 'tool'          # [[TOOL:...]] status marker
+    THINKING = 'thinking'  # [[THINKING:...]] reasoning marker
+    OTHER = 'other'        # Bracketed text that is not a marker
+
+
+def _classify_chunk(chunk: str) -> ChunkKind:
+    """Classify a chunk; plain text is decided by its first character alone."""
+    if chunk[:1] != '[':
+        return ChunkKind.TEXT
+    if chunk.startswith('[[TOOL:'):
+        return ChunkKind.TOOL
+    if chunk.startswith('[[THINKING:'):
+        return ChunkKind.THINKING
+    return ChunkKind.OTHER
+
+
+_THINKING_CHUNK_PREFIX = '[[THINKING:chunk:'
+
+_STREAM_END = object()
+
+# Text coalescing: token-sized chunks are merged before being sent. Done on
+# the event loop, where buffered text can be flushed on a timer while the
+# LLM stalls (a blocked generator could only flush on its next chunk).
+STREAM_FLUSH_MIN_CHARS = 256
+STREAM_FLUSH_MAX_LATENCY_MS = 50
+
+# Chunks the pump thread may hand over before the client reads them
+STREAM_QUEUE_MAX = 64
+STREAM_STOP_POLL_SECONDS = 0.25
+
+
+def _pump_generator(generator: Generator, loop: asyncio.AbstractEventLoop,
+                    queue: asyncio.Queue, credits: threading.Semaphore,
+                    stop: threading.Event) -> None:
+    """
+    Drive a streaming generator on its own thread, handing chunks to the loop.
+    
+    `credits` bounds the chunks in flight: each one is taken before a put and
+    returned by the consumer after its get, so a slow client blocks this thread
+    instead of growing the queue. `stop` (client went away) is checked before
+    every blocking step; closing the generator here runs its finally block,
+    which persists the (partial) turn.
+    """
+    try:
+        while not stop.is_set():
+            try:
+                chunk = next(generator)
+            except StopIteration:
+                break
+            while not credits.acquire(timeout=STREAM_STOP_POLL_SECONDS):
+                if stop.is_set():
+                    return
+            if stop.is_set():
+                return
+            loop.call_soon_threadsafe(queue.put_nowait, chunk)
+    except Exception as e:
+        logger.error(f"Streaming generator failed: {e}")
+    finally:
+        generator.close()
+        if not stop.is_set():
+            try:
+                # Sentinel uses the slot reserved beyond the credits
+                loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+            except RuntimeError:
+                pass  # Event loop already closed (shutdown)
+
 
 class ConversationService:
     """Service for managing conversations and AI interactions."""
@@ -39,19 +403,18 @@ class ConversationService:
     @staticmethod
     def get_conversation_data(conversation_id: str) -> Optional[dict]:
         """Fetch conversation from Firestore."""
-        from repositories import ConversationRepository
         return ConversationRepository.get(conversation_id)
     
     @staticmethod
     def delete_user_conversation(conversation_id: str, user_id: str) -> None:
         """Delete conversation from Firestore."""
-        from repositories import ConversationRepository
+        _wait_for_pending_turn(conversation_id)  # Don't let a late write recreate it
         ConversationRepository.delete(conversation_id, user_id)
+        _invalidate_cached_history(conversation_id)
     
     @staticmethod
     def get_user_conversations(user_id: str) -> list:
         """Get all conversations for a user."""
-        from repositories import ConversationRepository
         return ConversationRepository.get_by_user(user_id)
     
     @staticmethod
@@ -64,7 +427,8 @@ class ConversationService:
         reasoning_effort: str = 'medium',
         response_style: str = 'balanced',
         max_rows: int = None,
-        api_key: str = None
+        api_key: str = None,
+        is_new_conversation: bool = False
     ) -> Generator:
         """
         Create a generator for streaming AI responses WITH tool support.
@@ -79,31 +443,42 @@ class ConversationService:
             response_style: 'concise', 'balanced', or 'detailed'
             max_rows: Max rows to return from queries
             api_key: Optional API key for LLM calls (from rate limiter)
+            is_new_conversation: ID was just generated server-side, so there is
+                no stored history to fetch
             
         Yields:
             Text chunks from AI response, tool status markers, or error messages
         """
-        from repositories import ConversationRepository
-        from services.llm import LLMService
-        
-        prompt_stored = False
+        prompt_stored = False  # Prompt is persisted with the response in finally
         response_stored = False
-        full_response_content = []
+        full_response_content = io.StringIO()
+        thinking_content = io.StringIO()  # Reasoning text, stored separately
         tools_used = []
+        running_tools = {}  # name -> deque of running entries in start order (O(1) completion)
         was_aborted = False
+        db_prefetched = not db_config  # Nothing to warm without a connection
         
         try:
-            # Fetch existing conversation history for context
-            conv_data = ConversationRepository.get(conversation_id)
-            history = None
-            if conv_data and conv_data.get('messages'):
-                messages = conv_data.get('messages', [])
-                recent_messages = messages[-20:] if len(messages) > 20 else messages
-                history = [
-                    {"role": "user" if msg["sender"] == "user" else "model", "parts": [msg["content"]]}
-                    for msg in recent_messages
-                ]
-                logger.debug(f"Loaded {len(history)} messages for context")
+            # Fetch existing conversation history for context (cached per process).
+            # On a miss the Firestore read runs in the background while the
+            # tool schemas are prepared.
+            history_future = None
+            if is_new_conversation:
+                # Nothing stored yet - seed an empty entry so the write-through
+                # cache also covers the follow-up turn
+                history = []
+                _cache_history(conversation_id, history)
+            else:
+                _wait_for_pending_turn(conversation_id)  # Previous turn must be in history
+                history = _get_cached_history(conversation_id)
+            if history is None:
+                history_future = _io_executor.submit(_load_history, conversation_id)
+            
+            LLMService.get_tool_definitions()
+            
+            if history_future is not None:
+                history = history_future.result()
+            history = history or None
             
             # Use LLM Service with tool support
             responses = LLMService.send_message_with_tools(
@@ -118,64 +493,73 @@ class ConversationService:
             )
             
             for chunk in responses:
+                kind = _classify_chunk(chunk)
+                
+                if kind is ChunkKind.TEXT or kind is ChunkKind.THINKING:
+                    if kind is ChunkKind.TEXT:
+                        prompt_stored = True  # Persist user prompt once text arrives
+                        full_response_content.write(chunk)
+                    else:
+                        # Reasoning is stored in its own field, not in the response text
+                        if chunk.startswith(_THINKING_CHUNK_PREFIX) and chunk.endswith(']]'):
+                            thinking_content.write(chunk[len(_THINKING_CHUNK_PREFIX):-2])
+                        
+                        # Reasoning leaves the DB idle - warm its pool for the likely tool call
+                        if not db_prefetched:
+                            db_prefetched = True
+                            _io_executor.submit(_prefetch_db_pool, db_config)
+                    
+                    # Coalescing happens in create_streaming_generator_async
+                    yield chunk
+                    continue
+                
                 # Tool status markers - extract full data for persistence
-                if chunk.startswith('[[TOOL:'):
+                if kind is ChunkKind.TOOL:
                     # Full pattern: [[TOOL:name:status:args:result]]
                     # Args and result are JSON objects or 'null'
-                    full_match = re.match(
-                        r'\[\[TOOL:(\w+):(running|done):((?:\{.*?\}|null)):((?:\{.*?\}|null))\]\]',
-                        chunk,
-                        re.DOTALL
-                    )
-                    if full_match:
-                        tool_name, status, args_str, result_str = full_match.groups()
+                    # Markers from the orchestrator carry their fields - no parsing
+                    if type(chunk) is ToolMarker:
+                        marker = (chunk.name, chunk.status, chunk.args, chunk.result)
+                    else:
+                        marker = _parse_tool_marker(chunk)
+                    if marker:
+                        tool_name, status, args_str, result_str = marker
                         
                         if status == 'running':
                             # Track running tool with placeholder for args (result comes later)
-                            tools_used.append({
+                            entry = {
                                 'name': tool_name,
                                 'status': 'running',
                                 'args': args_str,
                                 'result': result_str
-                            })
-                            if not prompt_stored:
-                                ConversationRepository.store_message(conversation_id, 'user', prompt, user_id)
-                                prompt_stored = True
+                            }
+                            tools_used.append(entry)
+                            pending = running_tools.get(tool_name)
+                            if pending is None:
+                                running_tools[tool_name] = deque((entry,))
+                            else:
+                                pending.append(entry)
+                            prompt_stored = True
                         elif status == 'done':
                             # Update existing tool entry with 'done' status and full result
-                            updated = False
-                            for tool in tools_used:
-                                if tool['name'] == tool_name and tool['status'] == 'running':
-                                    tool['status'] = 'done'
-                                    tool['args'] = args_str  # May have more complete args now
-                                    tool['result'] = result_str
-                                    updated = True
-                                    break
+                            pending = running_tools.get(tool_name)
+                            if pending:
+                                tool = pending.popleft()
+                                tool['status'] = 'done'
+                                tool['args'] = args_str  # May have more complete args now
+                                tool['result'] = result_str
                             # If no running entry found, add as new (edge case)
-                            if not updated:
+                            else:
                                 tools_used.append({
                                     'name': tool_name,
                                     'status': 'done',
                                     'args': args_str,
                                     'result': result_str
                                 })
-                    
-                    full_response_content.append(chunk)
-                    yield chunk
-                    continue
-                
-                # Thinking markers
-                if chunk.startswith('[[THINKING:'):
-                    full_response_content.append(chunk)
-                    yield chunk
-                    continue
-                
-                # Store user prompt on first text chunk
-                if not prompt_stored and not chunk.startswith('['):
-                    ConversationRepository.store_message(conversation_id, 'user', prompt, user_id)
-                    prompt_stored = True
                 
-                full_response_content.append(chunk)
+                # Tool markers (and other bracketed text) stay in the stored content;
+                # the frontend renders tools inline from them on page load
+                full_response_content.write(chunk)
                 yield chunk
 
         except GeneratorExit:
@@ -183,12 +567,12 @@ class ConversationService:
             logger.info(f"Stream aborted for conversation {conversation_id}")
             
         except Exception as err:
-            error_str = str(err).lower()
+            match = _ERROR_CLASSIFY_RE.search(str(err))
             
-            if 'rate_limit' in error_str or 'quota' in error_str or '429' in error_str:
+            if match is not None and match.group(1):
                 logger.warning(f'Rate limit exceeded: {err}')
                 error_msg = "⚠️ **API Rate Limit Exceeded**\n\nPlease wait a moment and try again."
-            elif 'authentication' in error_str or '401' in error_str:
+            elif match is not None:
                 logger.error(f'Authentication error: {err}')
                 error_msg = "⚠️ **Authentication Error**\n\nPlease check API keys."
             else:
@@ -199,21 +583,133 @@ class ConversationService:
             
         finally:
             if prompt_stored and not response_stored:
-                response_text = "".join(full_response_content).strip()
+                # tell() is the written length - skip materializing an empty buffer
+                response_text = full_response_content.getvalue().strip() if full_response_content.tell() else ""
                 if response_text or tools_used:
                     if not response_text and tools_used:
                         response_text = "(Used tools to gather information)"
                     
                     if was_aborted and response_text:
                         response_text += "\n\n_(Response stopped by user)_"
+                else:
+                    response_text = None  # Store the prompt alone
+                
+                # Fire-and-forget: the client's stream ends without waiting on Firestore
+                _submit_turn(
+                    conversation_id, prompt, response_text, user_id,
+                    tools_used if tools_used else None,
+                    thinking=thinking_content.getvalue() if thinking_content.tell() else None,
+                    label="partial (aborted)" if was_aborted else "complete"
+                )
+                response_stored = response_text is not None
+    
+    @staticmethod
+    def flush_pending_writes() -> None:
+        """Wait for queued turn writes to finish (call on shutdown)."""
+        with _pending_lock:
+            futures = list(_pending_turns.values())
+        for future in futures:
+            try:
+                future.result(timeout=WRITE_TIMEOUT_SECONDS)
+            except Exception:
+                pass
+    
+    @staticmethod
+    async def create_streaming_generator_async(*args, min_flush_bytes: int = None,
+                                               max_latency_ms: int = None,
+                                               **kwargs) -> AsyncGenerator[str, None]:
+        """
+        Async wrapper around create_streaming_generator for the event loop.
+        
+        The sync generator (LLM network reads, tool execution, Firestore I/O)
+        runs on one dedicated thread per stream and hands chunks over through
+        a bounded asyncio.Queue, so the event loop only wakes when a chunk is
+        ready instead of hopping to a worker thread for every chunk.
+        Takes the same arguments as create_streaming_generator, plus:
+        
+        Args:
+            min_flush_bytes: Coalesce text chunks until this many chars are buffered
+            max_latency_ms: ...or until the oldest buffered text is this old
+        """
+        if min_flush_bytes is None:
+            min_flush_bytes = STREAM_FLUSH_MIN_CHARS
+        if max_latency_ms is None:
+            max_latency_ms = STREAM_FLUSH_MAX_LATENCY_MS
+        max_latency = max_latency_ms / 1000
+        
+        generator = ConversationService.create_streaming_generator(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_MAX + 1)
+        credits = threading.Semaphore(STREAM_QUEUE_MAX)
+        stop = threading.Event()
+        threading.Thread(
+            target=_pump_generator, args=(generator, loop, queue, credits, stop),
+            name='conversation-stream', daemon=True
+        ).start()
+        text_buffer = []  # Pending text/reasoning chunks not yet sent to the client
+        buffered_chars = 0
+        flush_at = 0.0
+        first_text_sent = False
+        first_thinking_sent = False
+        try:
+            while True:
+                if text_buffer and queue.empty():
+                    # Wait no longer than the oldest buffered text may sit
+                    try:
+                        chunk = await asyncio.wait_for(queue.get(), max(flush_at - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        yield ''.join(text_buffer)
+                        text_buffer.clear()
+                        buffered_chars = 0
+                        continue
+                else:
+                    chunk = await queue.get()
+                if chunk is _STREAM_END:
+                    if text_buffer:
+                        yield ''.join(text_buffer)
+                    break
+                credits.release()
+                
+                kind = _classify_chunk(chunk)
+                if kind is ChunkKind.TEXT or kind is ChunkKind.THINKING:
+                    # First token of each goes out immediately (time-to-first-token);
+                    # after that, tiny token chunks (reasoning markers included)
+                    # are coalesced into larger writes, in arrival order
+                    send_now = False
+                    if kind is ChunkKind.TEXT:
+                        send_now = not first_text_sent
+                        first_text_sent = True
+                    elif not first_thinking_sent and chunk.startswith(_THINKING_CHUNK_PREFIX):
+                        send_now = first_thinking_sent = True
                     
-                    ConversationRepository.store_message(
-                        conversation_id, 'ai', response_text, user_id,
-                        tools=tools_used if tools_used else None
-                    )
-                    response_stored = True
-                    status = "partial (aborted)" if was_aborted else "complete"
-                    logger.info(f"Stored AI response ({status}): {len(response_text)} chars")
+                    if send_now:
+                        if text_buffer:
+                            text_buffer.append(chunk)
+                            chunk = ''.join(text_buffer)
+                            text_buffer.clear()
+                            buffered_chars = 0
+                        yield chunk
+                        continue
+                    
+                    if not text_buffer:
+                        flush_at = loop.time() + max_latency
+                    text_buffer.append(chunk)
+                    buffered_chars += len(chunk)
+                    if buffered_chars >= min_flush_bytes or loop.time() >= flush_at:
+                        yield ''.join(text_buffer)
+                        text_buffer.clear()
+                        buffered_chars = 0
+                    continue
+                
+                # Markers keep their position: flush buffered text ahead of them
+                if text_buffer:
+                    yield ''.join(text_buffer)
+                    text_buffer.clear()
+                    buffered_chars = 0
+                yield chunk
+        finally:
+            # Client disconnected or stream finished - the pump closes the generator
+            stop.set()
     
     @staticmethod
     def get_streaming_headers(conversation_id: str) -> dict:
@@ -228,4 +724,4 @@ class ConversationService:
     def check_quota_error(error_message: str) -> bool:
         """Check if an error message indicates quota exceeded."""
         error_lower = error_message.lower()
-        return 'quota' in error_lower or '429' in error_lower or 'rate' in error_lower
+        return any(key in error_lower for key in _QUOTA_KEYS)
@@ -5,12 +5,29 @@ High-level database operations. All methods accept db_config and user_id explici
 No Flask dependencies.
 """
 
-import re
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
+from urllib.parse import urlsplit, urlunsplit
+
+from database.adapters import get_adapter
+from database.connection_manager import get_connection_manager
+from database.operations import DatabaseOperations, execute_sql_query, fetch_first_column
+from services.connection_service import ConnectionService
+from services.context_service import ContextService
 
 logger = logging.getLogger(__name__)
 
+# Database types with selectable schemas (select_schema / get_schemas)
+_SCHEMA_CAPABLE = frozenset({'postgresql'})
+
+# The one pool this module owns: get_table_info reads schema and row count
+# side by side. Kept apart from the Firestore I/O pools because each task
+# holds a pooled DB connection and can block for a full query timeout; 16
+# stays under the PostgreSQL pool's maxconn of 20. Context writes need no
+# pool here: ContextService buffers them and flushes from its own thread.
+_db_read_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='db-read')
+
 
 class DatabaseService:
     """Service for database operations - accepts config explicitly."""
@@ -28,9 +45,6 @@ class DatabaseService:
         Returns:
             Dict with status, message, tables, new db_config
         """
-        from database.adapters import get_adapter
-        from database.connection_manager import get_connection_manager
-        
         if not new_db_name:
             return {'status': 'error', 'message': 'Database name is required'}
         
@@ -44,10 +58,8 @@ class DatabaseService:
         db_type = db_config.get('db_type', 'postgresql')
         
         # Modify connection string to use new database
-        new_connection_string = re.sub(
-            r'(/[^/?]+)(\?|$)',
-            f'/{new_db_name}\\2',
-            connection_string
+        new_connection_string = urlunsplit(
+            urlsplit(connection_string)._replace(path=f'/{new_db_name}')
         )
         
         # Create new config
@@ -59,30 +71,25 @@ class DatabaseService:
         }
         
         try:
-            manager = get_connection_manager()
-            adapter = get_adapter(db_type)
+            DatabaseOperations.clear_cache()
             
-            # Test new connection
-            conn = manager.get_connection(new_config)
+            # No separate validate_connection probe: checking out a connection
+            # for the table listing fails the same way on a bad DSN. The previous
+            # database's pool is left open (the manager evicts idle/LRU pools).
+            tables = DatabaseService._fetch_tables(new_config, new_db_name, db_type)
             
-            if adapter.validate_connection(conn):
-                # Fetch tables
-                tables = DatabaseService._fetch_tables(new_config, new_db_name, db_type)
-                
-                # Update context
-                if user_id:
-                    DatabaseService._update_context(user_id, db_type, new_db_name, 'remote', True)
-                
-                logger.info(f"Switched to {db_type} database: {new_db_name}")
-                return {
-                    'status': 'success',
-                    'message': f'Switched to database: {new_db_name}',
-                    'selectedDatabase': new_db_name,
-                    'tables': tables,
-                    'db_config': new_config
-                }
+            # Update context
+            if user_id:
+                DatabaseService._update_context(user_id, db_type, new_db_name, 'remote', True)
             
-            return {'status': 'error', 'message': 'Failed to connect to new database'}
+            logger.info(f"Switched to {db_type} database: {new_db_name}")
+            return {
+                'status': 'success',
+                'message': f'Switched to database: {new_db_name}',
+                'selectedDatabase': new_db_name,
+                'tables': tables,
+                'db_config': new_config
+            }
         except Exception as err:
             logger.exception('Error switching database')
             return {'status': 'error', 'message': str(err)}
@@ -100,9 +107,6 @@ class DatabaseService:
         Returns:
             Dict with status, schema, tables
         """
-        from database.adapters import get_adapter
-        from database.connection_manager import get_connection_manager
-        
         if not schema_name:
             return {'status': 'error', 'message': 'Schema name is required'}
         
@@ -110,7 +114,7 @@ class DatabaseService:
             return {'status': 'error', 'message': 'No database connected'}
         
         db_type = db_config.get('db_type', 'mysql')
-        if db_type != 'postgresql':
+        if db_type not in _SCHEMA_CAPABLE:
             return {'status': 'error', 'message': 'Schema selection only for PostgreSQL'}
         
         # Update config with schema
@@ -125,14 +129,13 @@ class DatabaseService:
         try:
             with manager.get_cursor(new_config) as cursor:
                 cursor.execute(adapter.get_tables_query(schema_name))
-                tables = [row[0] for row in cursor.fetchall()]
+                tables = fetch_first_column(cursor)
         except Exception as err:
             logger.error(f"Error fetching tables for schema {schema_name}: {err}")
         
-        # Update context
+        # Update context (buffered by ContextService, never blocks the response)
         if user_id:
             try:
-                from services.context_service import ContextService
                 ContextService.update_schema(user_id, schema_name)
             except Exception as e:
                 logger.warning(f"Failed to update schema context: {e}")
@@ -150,14 +153,12 @@ class DatabaseService:
     @staticmethod
     def get_schemas(db_config: dict) -> dict:
         """Get all schemas in PostgreSQL database."""
-        from database.adapters import get_adapter
-        from database.connection_manager import get_connection_manager
         
         if not db_config:
             return {'status': 'error', 'message': 'No database connected'}
         
         db_type = db_config.get('db_type', 'mysql')
-        if db_type != 'postgresql':
+        if db_type not in _SCHEMA_CAPABLE:
             return {'status': 'error', 'message': 'Schema selection only for PostgreSQL'}
         
         adapter = get_adapter(db_type)
@@ -166,7 +167,7 @@ class DatabaseService:
         schemas = []
         with manager.get_cursor(db_config) as cursor:
             cursor.execute(adapter.get_schemas_query())
-            schemas = [row[0] for row in cursor.fetchall()]
+            schemas = fetch_first_column(cursor)
         
         return {
             'status': 'success', 
@@ -177,7 +178,6 @@ class DatabaseService:
     @staticmethod
     def get_tables(db_config: dict) -> dict:
         """Get all tables in current database/schema."""
-        from database.operations import DatabaseOperations
         
         if not db_config:
             return {'status': 'error', 'message': 'No database connected'}
@@ -192,9 +192,8 @@ class DatabaseService:
         return {'status': 'success', 'tables': tables, 'database': db_name, 'schema': schema}
     
     @staticmethod
-    def get_table_info(db_config: dict, table_name: str) -> dict:
-        """Get table schema + row count."""
-        from database.operations import DatabaseOperations
+    def get_table_info(db_config: dict, table_name: str, exact_count: bool = False) -> dict:
+        """Get table schema + row count (estimated unless exact_count)."""
         
         if not table_name:
             return {'status': 'error', 'message': 'Table name is required'}
@@ -206,8 +205,13 @@ class DatabaseService:
         if not db_name:
             return {'status': 'error', 'message': 'No database selected'}
         
-        schema = DatabaseOperations.get_table_schema(db_config, table_name, db_name)
-        row_count = DatabaseOperations.get_table_row_count(db_config, table_name, db_name)
+        schema_future = _db_read_executor.submit(
+            DatabaseOperations.get_table_schema, db_config, table_name, db_name
+        )
+        row_count = DatabaseOperations.get_table_row_count(
+            db_config, table_name, db_name, exact=exact_count
+        )
+        schema = schema_future.result()
         
         return {
             'status': 'success',
@@ -228,19 +232,17 @@ class DatabaseService:
         Returns:
             Dict with status and message
         """
-        from database.operations import DatabaseOperations
-        from database.connection_manager import get_connection_manager
-        
         try:
             manager = get_connection_manager()
             closed = manager.close_pool(db_config) if db_config else False
             
             DatabaseOperations.clear_cache()
+            if db_config:
+                ConnectionService.invalidate_validation_cache(db_config)
             
             # Clear Firestore context
             if user_id:
                 try:
-                    from services.context_service import ContextService
                     ContextService.clear_connection(user_id)
                 except Exception as e:
                     logger.warning(f"Failed to clear context: {e}")
@@ -267,17 +269,15 @@ class DatabaseService:
         Returns:
             Query result dict
         """
-        from database.operations import execute_sql_query
-        
         result = execute_sql_query(db_config, sql_query, max_rows=max_rows, timeout_seconds=timeout)
         
         # Log query to context
         if user_id:
+            db_name = db_config.get('database') if db_config else None
+            row_count = result.get('row_count', 0)
+            status = 'success' if result['status'] == 'success' else 'error'
+            # add_query only buffers the entry (flushed in batches)
             try:
-                from services.context_service import ContextService
-                db_name = db_config.get('database') if db_config else None
-                row_count = result.get('row_count', 0)
-                status = 'success' if result['status'] == 'success' else 'error'
                 ContextService.add_query(user_id, sql_query, db_name, row_count, status)
             except Exception as e:
                 logger.warning(f"Failed to log query: {e}")
@@ -287,40 +287,43 @@ class DatabaseService:
     @staticmethod
     def get_databases(db_config: dict) -> dict:
         """Get list of databases with is_remote flag."""
-        from database.operations import DatabaseOperations
         
         result = DatabaseOperations.get_databases(db_config)
         
-        if db_config and db_config.get('connection_string'):
+        # Connection-string configs are stamped is_remote=True at connect time
+        if db_config and db_config.get('is_remote'):
             result['is_remote'] = True
         
         return result
     
     @staticmethod
     def _fetch_tables(db_config: dict, db_name: str, db_type: str) -> List[str]:
-        """Fetch tables for a database."""
-        from database.adapters import get_adapter
-        from database.connection_manager import get_connection_manager
+        """
+        Fetch tables for a database.
+        
+        Connection failures propagate; a failing table query yields [].
+        """
         
         tables = []
         adapter = get_adapter(db_type)
         manager = get_connection_manager()
         
-        try:
-            with manager.get_cursor(db_config) as cursor:
+        with manager.get_cursor(db_config) as cursor:
+            try:
                 tables_query, tables_params = adapter.get_all_tables_for_cache(db_name)
                 cursor.execute(tables_query, tables_params)
-                tables = [row[0] for row in cursor.fetchall()]
-        except Exception as e:
-            logger.warning(f"Failed to fetch tables: {e}")
+                tables = fetch_first_column(cursor)
+            except Exception as e:
+                logger.warning(f"Failed to fetch tables: {e}")
         
         return tables
     
     @staticmethod
     def _update_context(user_id: str, db_type: str, database: str, host: str, is_remote: bool):
         """Update user's connection context in Firestore."""
+        # set_connection only buffers a debounced write, so it stays inline
+        # (keeps connect/disconnect ordering intact)
         try:
-            from services.context_service import ContextService
             ContextService.set_connection(user_id, db_type, database, host, is_remote)
         except Exception as e:
             logger.warning(f"Failed to update context: {e}")
@@ -1,12 +1,11 @@
 # File: services/firestore_service.py
 """Firestore service for conversation storage"""
 
-import re
 import firebase_admin
 from firebase_admin import credentials, firestore
 from functools import lru_cache
+from itertools import cycle
 from config import Config
-from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,136 +45,66 @@ def get_firestore_db():
     return firestore.client()
 
 
-def _strip_markers(text):
+@lru_cache(maxsize=1)
+def get_firestore_async_db():
     """
-    Strip streaming markers from message before storing.
+    Get async Firestore database instance (for use from the event loop).
     
-    These markers ([[THINKING:...]], [[TOOL:...]]) are for real-time UI rendering.
-    Stored messages should contain only the clean content.
+    Shares the Firebase app with get_firestore_db().
+    For testing, call get_firestore_async_db.cache_clear() to reset.
     """
-    if not text:
-        return text
+    from firebase_admin import firestore_async
+    _initialize_firebase()
+    return firestore_async.client()
+
+
+@lru_cache(maxsize=1)
+def _pooled_client_cycle():
+    """Round-robin over the pooled clients (built once, on first use)."""
+    from google.cloud import firestore as gcloud_firestore
     
-    # Strip thinking markers
-    text = re.sub(r'\[\[THINKING:start\]\]', '', text)
-    text = re.sub(r'\[\[THINKING:chunk:.*?\]\]', '', text)
-    text = re.sub(r'\[\[THINKING:end\]\]', '', text)
+    db = get_firestore_db()
+    count = max(1, Config.FIRESTORE_POOL_CLIENTS)
+    if count == 1:
+        return cycle([db])
     
-    # Strip tool markers (keep result data separate in 'tools' field)
-    text = re.sub(r'\[\[TOOL:[^\]]+\]\]', '', text)
+    # Extra clients share the app's credentials but open their own channels
+    app = firebase_admin.get_app()
+    credential = app.credential.get_credential()
+    clients = [db] + [
+        gcloud_firestore.Client(project=db.project, credentials=credential)
+        for _ in range(count - 1)
+    ]
+    logger.info(f"Firestore client pool ready with {count} clients")
+    return cycle(clients)
+
+
+def get_pooled_firestore_db():
+    """
+    Get a Firestore client for one operation, round-robin across a small pool.
     
-    return text.strip()
+    Spreading per-turn reads and writes (history load at the start of a
+    stream, persistence at the end) over several gRPC channels keeps one slow
+    call from stalling others under concurrent load.
+    Pool size comes from Config.FIRESTORE_POOL_CLIENTS (1 disables the pool).
+    """
+    return next(_pooled_client_cycle())
 
 
-def store_conversation(conversation_id, sender, message, user_id, tools=None):
-    """Store conversation message in Firestore
+def warmup_firestore(timeout: float = 1.0) -> None:
+    """
+    Open the Firestore channel ahead of the first user request.
     
-    Args:
-        conversation_id: The conversation ID
-        sender: 'user' or 'ai'
-        message: The message content
-        user_id: The user ID
-        tools: Optional list of tools used (for AI messages)
+    Builds the client and issues a cheap document read so the gRPC
+    handshake and OAuth token fetch happen at startup. Failures are
+    logged and ignored - the first real request will simply pay the cost.
     """
     try:
         db = get_firestore_db()
-        conversation_ref = db.collection('conversations').document(conversation_id)
-
-        if not conversation_ref.get().exists:
-            conversation_ref.set({
-                'user_id': user_id,
-                'timestamp': datetime.now(),
-                'messages': []
-            })
-
-        # Clean the message content for storage
-        # AI messages may contain streaming markers that should not be persisted
-        clean_message = _strip_markers(message) if sender == 'ai' else message
-        
-        # Build the message object
-        message_data = {
-            'sender': sender,
-            'content': clean_message,
-            'timestamp': datetime.now()
-        }
-        
-        # Add tools info if provided (for AI messages)
-        if tools:
-            message_data['tools'] = tools
-
-        conversation_ref.update({
-            'messages': firestore.ArrayUnion([message_data])
-        })
-        logger.debug(f"Conversation {conversation_id} updated successfully")
-    except Exception as e:
-        logger.error(f"Error storing conversation: {e}")
-        raise
-
-
-def get_conversations(user_id):
-    """Get all conversations for a user"""
-    try:
-        db = get_firestore_db()
-        from google.cloud.firestore_v1 import FieldFilter
-        conversations = (
-            db.collection('conversations')
-            .where(filter=FieldFilter('user_id', '==', user_id))
-            .get()
-        )
-        conversation_list = []
-        for conv in conversations:
-            conv_data = conv.to_dict()
-            if conv_data.get('messages'):
-                conversation_list.append({
-                    'id': conv.id,
-                    'timestamp': conv_data['timestamp'],
-                    'title': conv_data['messages'][0]['content'][:40] + ('...' if len(conv_data['messages'][0]['content']) > 40 else ''),
-                    'preview': conv_data['messages'][0]['content'][:50] + '...'
-                })
-        # Sort by timestamp descending (newest first)
-        conversation_list.sort(key=lambda x: x['timestamp'], reverse=True)
-        return conversation_list
-    except Exception as e:
-        logger.error(f"Error retrieving conversations: {e}")
-        raise
-
-
-def get_conversation(conversation_id):
-    """Get specific conversation by ID"""
-    try:
-        db = get_firestore_db()
-        conversation = db.collection('conversations').document(conversation_id).get()
-        if conversation.exists:
-            return conversation.to_dict()
-        return None
+        db.collection('_warmup').document('_').get(timeout=timeout)
+        logger.info("Firestore client warmed up")
     except Exception as e:
-        logger.error(f"Error retrieving conversation {conversation_id}: {e}")
-        raise
-
-
-def delete_conversation(conversation_id, user_id):
-    """Delete a conversation by ID and ensure user owns it"""
-    try:
-        db = get_firestore_db()
-
-        # Get conversation reference
-        conversation_ref = db.collection('conversations').document(conversation_id)
-        conversation = conversation_ref.get()
-
-        # Check if conversation exists and belongs to user
-        if conversation.exists:
-            conv_data = conversation.to_dict()
-            if conv_data['user_id'] == user_id:
-                conversation_ref.delete()
-                logger.info(f"Conversation {conversation_id} deleted successfully")
-                return True
-            else:
-                raise PermissionError("User does not own this conversation")
-        else:
-            raise ValueError("Conversation not found")
-    except Exception as e:
-        logger.error(f"Error deleting conversation {conversation_id}: {e}")
-        raise
+        logger.warning(f"Firestore warmup skipped: {e}")
 
 
 # Backward compatibility - keeping FirestoreService for existing imports
@@ -186,7 +115,8 @@ class FirestoreService:
     
     Migration:
         FirestoreService.get_db() -> get_firestore_db()
-        FirestoreService.store_conversation(...) -> store_conversation(...)
+    
+    Conversation persistence lives in repositories.ConversationRepository.
     """
     
     @classmethod
@@ -199,27 +129,7 @@ class FirestoreService:
         """DEPRECATED: Use get_firestore_db() instead."""
         return get_firestore_db()
     
-    @staticmethod
-    def _strip_markers(text):
-        """DEPRECATED: Use _strip_markers() module function."""
-        return _strip_markers(text)
-    
-    @staticmethod
-    def store_conversation(conversation_id, sender, message, user_id, tools=None):
-        """DEPRECATED: Use store_conversation() module function."""
-        return store_conversation(conversation_id, sender, message, user_id, tools)
-    
-    @staticmethod
-    def get_conversations(user_id):
-        """DEPRECATED: Use get_conversations() module function."""
-        return get_conversations(user_id)
-    
-    @staticmethod
-    def get_conversation(conversation_id):
-        """DEPRECATED: Use get_conversation() module function."""
-        return get_conversation(conversation_id)
-    
-    @staticmethod
-    def delete_conversation(conversation_id, user_id):
-        """DEPRECATED: Use delete_conversation() module function."""
-        return delete_conversation(conversation_id, user_id)
\ No newline at end of file
+    @classmethod
+    def get_pooled_db(cls):
+        """Use get_pooled_firestore_db() in new code."""
+        return get_pooled_firestore_db()
@@ -7,13 +7,28 @@ Exports:
 - PromptBuilder: System prompt and message construction
 - ToolExecutor: Tool execution and result processing
 - ChatOrchestrator: Conversation flow and agentic loop
+- ToolMarker: Tool status chunk with its fields attached
 """
 
+import importlib
+import os
+
+# Heavy third-party SDKs behind this package. With LLM_EAGER_IMPORT=1 they are
+# imported on parallel threads at startup (their init does file I/O that
+# releases the GIL). Our own submodules import each other, so they stay
+# sequential below; by default everything is imported lazily as before.
+_EAGER_IMPORTS = ('cerebras.cloud.sdk', 'pydantic')
+
+if os.getenv('LLM_EAGER_IMPORT') == '1':
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(_EAGER_IMPORTS)) as _pool:
+        list(_pool.map(importlib.import_module, _EAGER_IMPORTS))
+
 from .service import LLMService
 from .client import LLMClient
 from .prompt_builder import PromptBuilder
 from .tool_executor import ToolExecutor
-from .orchestrator import ChatOrchestrator
+from .orchestrator import ChatOrchestrator, ToolMarker
 
 __all__ = [
     'LLMService',
@@ -21,4 +36,5 @@ __all__ = [
     'PromptBuilder',
     'ToolExecutor',
     'ChatOrchestrator',
+    'ToolMarker',
 ]
@@ -6,6 +6,7 @@ Handles Cerebras SDK client creation, model selection, and token limits.
 
 import os
 import logging
+from functools import lru_cache
 from cerebras.cloud.sdk import Cerebras
 
 logger = logging.getLogger(__name__)
@@ -16,7 +17,17 @@ DEFAULT_MAX_TOKENS = 4096
 DEFAULT_MAX_COMPLETION_TOKENS = 8192
 
 # Models that support reasoning (Cerebras-specific)
-REASONING_MODELS = ['gpt-oss-120b', 'zai-glm-4.6']
+REASONING_MODELS = frozenset({'gpt-oss-120b', 'zai-glm-4.6'})
+
+
+@lru_cache(maxsize=16)
+def _client_for_key(key: str) -> Cerebras:
+    """
+    One SDK client per API key, so its HTTP connection pool is reused.
+    
+    Keys rotate through a small set (LLM_API_KEYS), hence a bounded cache.
+    """
+    return Cerebras(api_key=key)
 
 
 class LLMClient:
@@ -25,7 +36,7 @@ class LLMClient:
     @staticmethod
     def get_client(api_key: str = None) -> Cerebras:
         """
-        Creates and returns a Cerebras SDK client.
+        Returns the shared Cerebras SDK client for the API key.
         
         Args:
             api_key: Optional API key. If not provided, falls back to env var.
@@ -43,25 +54,29 @@ class LLMClient:
             logger.error("No LLM API key found in environment variables")
             raise ValueError("LLM_API_KEY or LLM_API_KEYS is required")
             
-        return Cerebras(api_key=key)
+        return _client_for_key(key)
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_model_name() -> str:
         """Gets the model name from environment or defaults."""
         return os.getenv('LLM_MODEL', DEFAULT_MODEL)
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def is_reasoning_model() -> bool:
         """Check if current model supports reasoning."""
         model = LLMClient.get_model_name()
         return model in REASONING_MODELS
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_max_tokens() -> int:
         """Gets max response tokens from environment or defaults."""
         return int(os.getenv('LLM_MAX_TOKENS', DEFAULT_MAX_TOKENS))
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_max_completion_tokens() -> int:
         """Gets max completion tokens (for reasoning) from environment or defaults."""
         return int(os.getenv('LLM_MAX_COMPLETION_TOKENS', DEFAULT_MAX_COMPLETION_TOKENS))
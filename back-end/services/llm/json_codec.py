@@ -0,0 +1,33 @@
+"""
+JSON encode/decode for the LLM streaming path.
+
+Uses orjson when installed and falls back to stdlib json otherwise.
+Encoded output is always str so it can be framed into stream markers.
+"""
+
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # Datetimes pass through to default=str so output matches json.dumps
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj) -> str:
+    """Serialize obj to a JSON string (non-JSON values go through str)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTS).decode()
+    return json.dumps(obj, default=str)
+
+
+def loads(data):
+    """Parse a JSON str or bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -4,10 +4,19 @@ ChatOrchestrator - Conversation flow and agentic loop management.
 Handles the multi-turn tool calling loop and final streaming response generation.
 """
 
-import json
+import hashlib
 import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import SimpleNamespace
 from typing import Generator
 
+from config import Config
+from utils.ttl_cache import TTLCache
+from services import shared_cache
+from . import json_codec
 from .client import LLMClient
 from .prompt_builder import PromptBuilder
 from .tool_executor import ToolExecutor
@@ -17,6 +26,183 @@ logger = logging.getLogger(__name__)
 # Safety limit to prevent infinite loops
 MAX_TOOL_ROUNDS = 10
 
+# Reasoning stream framing (the consumer matches these prefixes)
+_THINKING_START = "[[THINKING:start]]"
+_THINKING_END = "[[THINKING:end]]"
+_THINKING_CHUNK_PREFIX = "[[THINKING:chunk:"
+
+# execute_query max_rows shown in the UI when the user picked "No Limit"
+_NO_LIMIT_DISPLAY = f"No Limit (server max: {Config.MAX_QUERY_RESULTS})"
+
+# Tool calls from one model turn run on up to this many threads (1 = serial).
+# The cap is per round: each round gets its own short-lived pool, so one
+# chat's slow queries never queue another chat's tool calls.
+TOOL_CONCURRENCY = int(os.getenv('LLM_TOOL_CONCURRENCY', 4))
+
+
+# Invariant part of every tool-round request (tool definitions are static)
+_TOOL_ROUND_PARAMS = {
+    'tools': ToolExecutor.get_tool_definitions(),
+    'tool_choice': "auto",
+    'parallel_tool_calls': TOOL_CONCURRENCY > 1,
+    'temperature': 0,  # Greedy decoding: reproducible tool arguments and answers
+    'top_p': 1,
+}
+_TOOL_COUNT = len(_TOOL_ROUND_PARAMS['tools'])
+
+
+# Requests the prompt's "SQL only" rule always declines - answered locally
+# without a model call. Anchored on an explicit "write me <language> code"
+# ask so messages that merely mention a language still reach the model, and
+# skipped whenever the message mentions the database at all (a Python script
+# that runs a query or a shell script that exports a table is in scope).
+_NON_SQL_CODE_RE = re.compile(
+    r'^(?!.*\b(?:sql|quer(?:y|ies)|databases?|dbs?|tables?|schemas?|rows?|columns?'
+    r'|records?|postgres(?:ql)?|mysql|sqlite|oracle|sql\s*server|csv|export|import|backup'
+    r'|connect(?:ion)?|cursor|orm|migrations?)\b)'
+    r'\s*(?:please\s+|can you\s+|could you\s+)?'
+    r'(?:write|create|generate|give me|make|build)\s+(?:me\s+)?(?:a\s+|an\s+|some\s+)?'
+    r'(?:python|javascript|js|typescript|java|rust|go|golang|c\+\+|c#|php|ruby|html|css|bash|shell)\s+'
+    r'(?:code|script|function|program|class|snippet|app)s?\b',
+    re.IGNORECASE | re.DOTALL
+)
+_NON_SQL_REFUSAL = (
+    "I'm a database assistant, so I can only help with SQL and your connected "
+    "databases. If it helps, I can write the SQL query this code would run."
+)
+
+# Tool-free answers from the first round (non-reasoning path only). Kept in
+# Redis when configured so all workers share them; this is the fallback.
+_response_cache = TTLCache(Config.LLM_RESPONSE_CACHE_MAX, Config.LLM_RESPONSE_CACHE_TTL)
+
+
+def _response_cache_key(model_name: str, messages: list, user_id: str = None,
+                        db_config: dict = None) -> str:
+    """
+    Digest of the model, the full prompt (system, history, user) and who is
+    asking about which database, so answers built from one user's schema or
+    data are never served to another user or another database.
+    """
+    pool_key = None
+    schema = None
+    if db_config:
+        from database.connection_manager import get_connection_manager
+        pool_key = get_connection_manager().get_pool_key(db_config)
+        schema = db_config.get('schema')
+    payload = json_codec.dumps([model_name, str(user_id), pool_key, schema, messages]).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _get_cached_response(cache_key: str):
+    """Cached answer for a prompt digest, or None."""
+    client = shared_cache.get_shared_redis()
+    if client is not None:
+        return shared_cache.get_response(client, cache_key)
+    return _response_cache.get(cache_key)
+
+
+def _cache_response(cache_key: str, answer: str) -> None:
+    """Store a tool-free answer under its prompt digest."""
+    client = shared_cache.get_shared_redis()
+    if client is not None:
+        shared_cache.put_response(client, cache_key, answer, Config.LLM_RESPONSE_CACHE_TTL)
+    else:
+        _response_cache.put(cache_key, answer)
+
+
+def _tool_message(tool_call, function_name: str, content: str) -> dict:
+    """Tool result message answering one tool_call_id."""
+    return {
+        "tool_call_id": tool_call.id,
+        "role": "tool",
+        "name": function_name,
+        "content": content
+    }
+
+
+def _stream_tool_round(stream, live: bool):
+    """
+    Consume one streamed tool round, yielding its text as it arrives.
+    
+    With live=False text is held back until the model starts a tool call
+    (it was preamble, not the answer) and dropped if none follows.
+    
+    Returns:
+        (assistant_message, tool_calls) - message dict for the history and
+        the assembled calls with .id / .function.name / .function.arguments
+    """
+    parts = []
+    held = []
+    calls = {}  # delta index -> {'id', 'name', 'arguments'}
+    
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        
+        content = delta.content
+        if content:
+            parts.append(content)
+            if live or calls:
+                yield content
+            else:
+                held.append(content)
+        
+        for fragment in delta.tool_calls or ():
+            if not calls and held:
+                yield "".join(held)
+                held.clear()
+            index = fragment.index if fragment.index is not None else len(calls)
+            entry = calls.setdefault(index, {'id': None, 'name': '', 'arguments': []})
+            if fragment.id:
+                entry['id'] = fragment.id
+            function = fragment.function
+            if function is not None:
+                if function.name:
+                    entry['name'] += function.name
+                if function.arguments:
+                    entry['arguments'].append(function.arguments)
+    
+    tool_calls = [
+        SimpleNamespace(
+            id=entry['id'],
+            function=SimpleNamespace(name=entry['name'], arguments="".join(entry['arguments']))
+        )
+        for _, entry in sorted(calls.items())
+    ]
+    assistant_message = {
+        "role": "assistant",
+        "content": "".join(parts) or None,
+    }
+    if tool_calls:
+        assistant_message["tool_calls"] = [
+            {
+                "id": call.id,
+                "type": "function",
+                "function": {"name": call.function.name, "arguments": call.function.arguments},
+            }
+            for call in tool_calls
+        ]
+    return assistant_message, tool_calls
+
+
+class ToolMarker(str):
+    """
+    A [[TOOL:name:status:args:result]] chunk that also carries its fields.
+    
+    Streams as ordinary text (the frontend parses the marker), while
+    in-process consumers read .name/.status/.args/.result directly instead
+    of parsing the string back.
+    """
+    
+    def __new__(cls, name: str, status: str, args: str, result: str):
+        marker = super().__new__(cls, f"[[TOOL:{name}:{status}:{args}:{result}]]\n\n")
+        marker.name = name
+        marker.status = status
+        marker.args = args
+        marker.result = result
+        return marker
+
 
 class ChatOrchestrator:
     """Conversation flow and agentic loop management."""
@@ -32,7 +218,7 @@ class ChatOrchestrator:
         Returns a non-streaming response.
         """
         client = LLMClient.get_client()
-        messages = PromptBuilder.build_messages(history, message)
+        messages = PromptBuilder.build_messages(history, message, conversation_id=conversation_id)
         
         response = client.chat.completions.create(
             model=LLMClient.get_model_name(),
@@ -73,63 +259,84 @@ class ChatOrchestrator:
         Yields:
             Text chunks from AI response, tool status markers, or error messages
         """
+        # Out-of-scope code requests get the canned refusal, no SDK call
+        if message and _NON_SQL_CODE_RE.match(message):
+            logger.info("Declining non-SQL code request without calling the LLM")
+            yield _NON_SQL_REFUSAL
+            return
+        
         client = LLMClient.get_client(api_key)
         model_name = LLMClient.get_model_name()
         
         # Build messages with history and style
-        messages = PromptBuilder.build_messages(history, message, response_style)
+        messages = PromptBuilder.build_messages(history, message, response_style, conversation_id)
+        
+        # Determine if we should use reasoning for this request
+        use_reasoning = enable_reasoning and LLMClient.is_reasoning_model()
         
-        # Get tool definitions
-        tools = ToolExecutor.get_tool_definitions()
+        # Reasoning answers are sampled at temperature 1, so only the
+        # greedy (temperature 0) tool-round answer is worth replaying
+        cache_key = None
+        if not use_reasoning and Config.LLM_RESPONSE_CACHE_TTL > 0:
+            cache_key = _response_cache_key(model_name, messages, user_id, db_config)
+            cached = _get_cached_response(cache_key)
+            if cached is not None:
+                logger.info("Serving tool-free answer from response cache")
+                yield cached
+                return
         
         try:
             # Agentic loop: Keep calling the model until it stops making tool calls
             tool_round = 0
+            answered = False
             
             while tool_round < MAX_TOOL_ROUNDS:
                 tool_round += 1
-                logger.info(f"Tool round {tool_round}: Sending request to LLM ({model_name}) with {len(tools)} tools")
+                logger.info(f"Tool round {tool_round}: Sending request to LLM ({model_name}) with {_TOOL_COUNT} tools")
                 
-                response = client.chat.completions.create(
+                stream = client.chat.completions.create(
                     model=model_name,
                     messages=messages,
-                    tools=tools,
-                    tool_choice="auto",
-                    parallel_tool_calls=False,  # Sequential tool execution for reliability
-                    temperature=0.1,  # Low temp for accurate tool usage
-                    top_p=0.1
+                    stream=True,
+                    **_TOOL_ROUND_PARAMS
                 )
                 
-                response_message = response.choices[0].message
-                tool_calls = response_message.tool_calls
+                # Without reasoning a round that calls no tools is the answer,
+                # so its text streams live; with reasoning the answer comes
+                # from the reasoning pass below and only preamble is shown
+                response_message, tool_calls = yield from _stream_tool_round(
+                    stream, live=not use_reasoning
+                )
                 
                 # If no tool calls, we're done with the loop
                 if not tool_calls:
                     logger.info(f"No more tool calls after {tool_round} rounds")
+                    answered = not use_reasoning and bool(response_message["content"])
+                    if answered and cache_key and tool_round == 1:
+                        _cache_response(cache_key, response_message["content"])
                     break
                 
                 # Add assistant response to messages
                 messages.append(response_message)
                 
-                # Execute each tool call in this round
-                for tool_call in tool_calls:
+                # Validate every call and announce it before running any of them.
+                # Tool messages are slotted by call index so they reach the
+                # history in the order the model issued the calls.
+                tool_messages = [None] * len(tool_calls)
+                pending = []  # (slot, tool_call, function_name, function_args, args_json)
+                for slot, tool_call in enumerate(tool_calls):
                     function_name = tool_call.function.name
                     
-                    # Parse and validate arguments using Pydantic schemas
+                    # Parse and validate arguments in one pass (Pydantic reads the JSON)
                     try:
-                        raw_args = json.loads(tool_call.function.arguments) if tool_call.function.arguments else {}
-                        function_args = ToolExecutor.validate_and_parse_args(function_name, raw_args)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON parse error for {function_name}: {e}")
-                        function_args = {}
-                        # Yield error and continue to next tool
-                        yield f'[[TOOL:{function_name}:done:{{}}:{{"success":false,"error":"Invalid JSON arguments"}}]]\n\n'
-                        continue
+                        function_args = ToolExecutor.validate_and_parse_args(
+                            function_name, tool_call.function.arguments or ""
+                        )
                     except ValueError as e:
                         logger.error(f"Validation error for {function_name}: {e}")
-                        # Yield validation error
-                        error_msg = json.dumps({"success": False, "error": str(e)})
-                        yield f'[[TOOL:{function_name}:done:{{}}:{error_msg}]]\n\n'
+                        error_msg = json_codec.dumps({"success": False, "error": str(e)})
+                        yield ToolMarker(function_name, 'done', '{}', error_msg)
+                        tool_messages[slot] = _tool_message(tool_call, function_name, error_msg)
                         continue
                     
                     # Extract conversational rationale if present
@@ -146,47 +353,52 @@ class ChatOrchestrator:
                             display_args['max_rows'] = max_rows
                         else:
                             # No Limit selected - show what the server will actually use
-                            from config import Config
-                            display_args['max_rows'] = f"No Limit (server max: {Config.MAX_QUERY_RESULTS})"
+                            display_args['max_rows'] = _NO_LIMIT_DISPLAY
                     
-                    args_json = json.dumps(display_args, default=str)
+                    args_json = json_codec.dumps(display_args)
                     
                     # Yield "running" status BEFORE tool execution
-                    yield f"[[TOOL:{function_name}:running:{args_json}:null]]\n\n"
-                    
-                    # Execute the tool
-                    function_response = ToolExecutor.execute(
-                        function_name, function_args, user_id,
-                        db_config=db_config, max_rows=max_rows
-                    )
-                    
-                    # Yield "done" status with STRUCTURED result (includes full data for frontend)
-                    result_summary = ToolExecutor.summarize_for_ui(
-                        function_name,
-                        json.loads(function_response)
-                    )
-                    yield f"[[TOOL:{function_name}:done:{args_json}:{result_summary}]]\n\n"
-                    
-                    # Create token-efficient summary for LLM context (excludes full data)
-                    llm_summary = ToolExecutor.summarize_for_llm(
-                        function_name,
-                        json.loads(function_response)
-                    )
+                    yield ToolMarker(function_name, 'running', args_json, 'null')
+                    pending.append((slot, tool_call, function_name, function_args, args_json))
+                
+                # Run the round's tools concurrently; results are consumed in
+                # call order so markers and tool messages keep their pairing
+                run_tool = partial(
+                    ToolExecutor.execute_structured, user_id=user_id, db_config=db_config, max_rows=max_rows
+                )
+                workers = min(len(pending), TOOL_CONCURRENCY)
+                if workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='llm-tool') as pool:
+                        futures = [
+                            pool.submit(run_tool, function_name, function_args)
+                            for _, _, function_name, function_args, _ in pending
+                        ]
+                        responses = [future.result() for future in futures]
+                else:
+                    responses = [
+                        run_tool(function_name, function_args)
+                        for _, _, function_name, function_args, _ in pending
+                    ]
+                
+                for (slot, tool_call, function_name, _, args_json), result in zip(pending, responses):
+                    # STRUCTURED result for the frontend (includes full data) and a
+                    # token-efficient one for LLM context (excludes full data),
+                    # both from one structuring pass over the native result
+                    result_summary, llm_summary = ToolExecutor.summarize(function_name, result)
+                    yield ToolMarker(function_name, 'done', args_json, result_summary)
                     
-                    # Add tool response to messages for LLM context
-                    messages.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": llm_summary
-                    })
+                    # Tool response for LLM context
+                    tool_messages[slot] = _tool_message(tool_call, function_name, llm_summary)
+                
+                messages.extend(tool_messages)
+            
+            # The last tool round already streamed a complete answer
+            if answered:
+                return
             
             # After tool loop, get final streaming response
             logger.info("Getting final response after all tool executions (streaming)")
             
-            # Determine if we should use reasoning for this request
-            use_reasoning = enable_reasoning and LLMClient.is_reasoning_model()
-            
             if use_reasoning:
                 # Use Cerebras SDK for reasoning models
                 stream = client.chat.completions.create(
@@ -214,26 +426,27 @@ class ChatOrchestrator:
             for chunk in stream:
                 delta = chunk.choices[0].delta
                 
-                # Handle reasoning tokens (thinking)
-                reasoning_content = getattr(delta, 'reasoning', None)
-                if use_reasoning and reasoning_content:
+                # Handle reasoning tokens (thinking). Only reasoning streams
+                # can carry the field, and older SDK deltas may not define it
+                reasoning_content = getattr(delta, 'reasoning', None) if use_reasoning else None
+                if reasoning_content:
                     if not reasoning_started:
-                        yield "[[THINKING:start]]"
+                        yield _THINKING_START
                         reasoning_started = True
-                    yield f"[[THINKING:chunk:{reasoning_content}]]"
+                    yield _THINKING_CHUNK_PREFIX + reasoning_content + "]]"
                 
                 # Handle content tokens
-                content = getattr(delta, 'content', None)
+                content = delta.content
                 if content:
                     has_content = True
                     if reasoning_started:
-                        yield "[[THINKING:end]]"
+                        yield _THINKING_END
                         reasoning_started = False
                     yield content
             
             # Close thinking if stream ended during reasoning
             if reasoning_started:
-                yield "[[THINKING:end]]"
+                yield _THINKING_END
             
             # If no content was yielded and no tools were called, provide fallback
             if not has_content and tool_round == 1:
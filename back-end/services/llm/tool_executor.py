@@ -4,12 +4,12 @@ ToolExecutor - Tool execution and result processing.
 Handles tool argument validation, execution delegation, and result summarization.
 """
 
-import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Union
 
 from services.ai_tools import ai_tools_list, AIToolExecutor
 from services.tool_schemas import validate_tool_args, structure_tool_result
+from .json_codec import dumps as _dumps
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +23,13 @@ class ToolExecutor:
         return ai_tools_list
     
     @staticmethod
-    def validate_and_parse_args(function_name: str, raw_args: Dict) -> Dict[str, Any]:
+    def validate_and_parse_args(function_name: str, raw_args: Union[str, Dict]) -> Dict[str, Any]:
         """
         Validate and parse tool arguments using Pydantic schemas.
         
         Args:
             function_name: Name of the tool
-            raw_args: Raw arguments dict from LLM
+            raw_args: Raw arguments from LLM (JSON string or dict)
             
         Returns:
             Validated and parsed arguments dict
@@ -40,6 +40,35 @@ class ToolExecutor:
         validated = validate_tool_args(function_name, raw_args or {})
         return validated.model_dump()
     
+    @staticmethod
+    def execute_structured(
+        function_name: str,
+        function_args: Dict[str, Any],
+        user_id: str,
+        db_config: Dict = None,
+        max_rows: int = None
+    ) -> Any:
+        """
+        Execute a tool and return its native result (normally a dict).
+        
+        Used by the orchestrator, which summarizes the result itself; skips
+        the serialize/parse round trip of execute().
+        
+        Args:
+            function_name: Name of the tool to execute
+            function_args: Validated arguments dict
+            user_id: User ID for context
+            db_config: Database connection config
+            max_rows: Max rows to return from queries
+            
+        Returns:
+            Result as returned by the tool
+        """
+        return AIToolExecutor.execute(
+            function_name, function_args, user_id,
+            db_config=db_config, max_rows=max_rows
+        )
+    
     @staticmethod
     def execute(
         function_name: str,
@@ -61,13 +90,13 @@ class ToolExecutor:
         Returns:
             JSON string of the result
         """
-        result = AIToolExecutor.execute(
+        result = ToolExecutor.execute_structured(
             function_name, function_args, user_id,
             db_config=db_config, max_rows=max_rows
         )
         # Ensure we return a string for the LLM tool result
         if isinstance(result, (dict, list)):
-            return json.dumps(result, default=str)
+            return _dumps(result)
         return str(result)
     
     @staticmethod
@@ -78,7 +107,7 @@ class ToolExecutor:
         This goes to frontend via [[TOOL:...]] marker and includes full data.
         """
         structured = structure_tool_result(tool_name, result)
-        return json.dumps(structured)
+        return _dumps(structured)
     
     @staticmethod
     def summarize_for_llm(tool_name: str, result: Dict[str, Any]) -> str:
@@ -88,10 +117,23 @@ class ToolExecutor:
         For execute_query, excludes the full 'data' field - LLM only sees 'preview'.
         This prevents token limit issues with large query results.
         """
-        structured = structure_tool_result(tool_name, result)
+        return ToolExecutor._llm_summary(tool_name, structure_tool_result(tool_name, result))
+    
+    @staticmethod
+    def summarize(tool_name: str, result: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Both summaries from a single structuring pass.
         
+        Returns:
+            (summary_for_ui, summary_for_llm)
+        """
+        structured = structure_tool_result(tool_name, result)
+        return _dumps(structured), ToolExecutor._llm_summary(tool_name, structured)
+    
+    @staticmethod
+    def _llm_summary(tool_name: str, structured: Dict[str, Any]) -> str:
+        """Serialize a structured result for LLM context."""
         # Remove full data field for execute_query - LLM only needs preview
         if tool_name == "execute_query" and 'data' in structured:
-            del structured['data']
-        
-        return json.dumps(structured)
+            structured = {k: v for k, v in structured.items() if k != 'data'}
+        return _dumps(structured)
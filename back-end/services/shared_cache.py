@@ -0,0 +1,157 @@
+# File: services/shared_cache.py
+"""
+Redis-backed conversation history and LLM response cache.
+
+Chat turns run on worker threads, so this uses a synchronous client on the
+same Upstash instance as the async session client in main.py. With it every
+uvicorn worker sees the same history window and cached answers, instead of
+each process keeping its own. Without UPSTASH_REDIS_URL (or with
+SHARED_CACHE_ENABLED=false) get_shared_redis() returns None and callers keep
+their process-local caches. Redis errors are logged and treated as misses.
+
+Layout:
+    conv:{conversation_id}:messages  list - a header element, then one JSON
+                                     chat message per entry (oldest first)
+    resp:{digest}                    string - cached answer, with TTL; the
+                                     digest covers model, user, database
+                                     and the full prompt
+"""
+
+import json
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import redis
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# First element of every history list. A missing key means "not cached";
+# the header lets a conversation with no messages yet still be cached, and
+# appends (RPUSHX) only ever extend a list that holds the complete window.
+_HISTORY_HEADER = "#"
+
+# Fail fast - a slow cache must not hold up a chat turn
+_SOCKET_TIMEOUT_SECONDS = 1.0
+
+
+def _history_key(conversation_id: str) -> str:
+    return f"conv:{conversation_id}:messages"
+
+
+@lru_cache(maxsize=1)
+def get_shared_redis() -> Optional[redis.Redis]:
+    """
+    Get the shared synchronous Redis client, or None when not configured.
+    
+    Uses @lru_cache for singleton behavior; the client's connection pool is
+    thread-safe. For testing, call get_shared_redis.cache_clear() to reset.
+    """
+    redis_url = Config.get_redis_url()
+    if not redis_url or not Config.SHARED_CACHE_ENABLED:
+        return None
+    return redis.Redis.from_url(
+        redis_url,
+        decode_responses=True,
+        socket_timeout=_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=_SOCKET_TIMEOUT_SECONDS,
+    )
+
+
+def close_shared_redis() -> None:
+    """Close the shared client's connections (application shutdown)."""
+    if get_shared_redis.cache_info().currsize:
+        client = get_shared_redis()
+        if client is not None:
+            client.close()
+
+
+# =============================================================================
+# CONVERSATION HISTORY
+# =============================================================================
+
+def get_history(client: redis.Redis, conversation_id: str) -> Optional[list]:
+    """Return the cached history window, or None on miss/error."""
+    try:
+        raw = client.lrange(_history_key(conversation_id), 0, -1)
+    except redis.RedisError as e:
+        logger.warning(f"Shared history read failed for {conversation_id}: {e}")
+        return None
+    if not raw:
+        return None
+    return [json.loads(entry) for entry in raw[1:]]
+
+
+def set_history(client: redis.Redis, conversation_id: str, history: list, ttl: int) -> None:
+    """Replace the cached history window."""
+    key = _history_key(conversation_id)
+    try:
+        pipe = client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.rpush(key, _HISTORY_HEADER, *(json.dumps(entry) for entry in history))
+        pipe.expire(key, ttl)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Shared history write failed for {conversation_id}: {e}")
+
+
+def append_history(
+    client: redis.Redis,
+    conversation_id: str,
+    entry: dict,
+    ttl: int,
+    window: int,
+    max_length: int
+) -> None:
+    """
+    Append one message to a cached history (no-op if it is not cached).
+    
+    Once the list grows past max_length entries it is cut back to the last
+    window entries, mirroring the block trimming of the local cache.
+    """
+    key = _history_key(conversation_id)
+    try:
+        pipe = client.pipeline(transaction=True)
+        pipe.rpushx(key, json.dumps(entry))
+        pipe.expire(key, ttl)
+        length = pipe.execute()[0]
+        if length > max_length + 1:  # +1 for the header
+            pipe = client.pipeline(transaction=True)
+            pipe.ltrim(key, -window, -1)
+            pipe.lpush(key, _HISTORY_HEADER)
+            pipe.execute()
+    except redis.RedisError as e:
+        # A missed append would leave a gap in the window - drop it instead
+        logger.warning(f"Shared history append failed for {conversation_id}: {e}")
+        delete_history(client, conversation_id)
+
+
+def delete_history(client: redis.Redis, conversation_id: str) -> None:
+    """Drop a cached history."""
+    try:
+        client.delete(_history_key(conversation_id))
+    except redis.RedisError as e:
+        logger.warning(f"Shared history delete failed for {conversation_id}: {e}")
+
+
+# =============================================================================
+# LLM RESPONSES
+# =============================================================================
+
+def get_response(client: redis.Redis, digest: str) -> Optional[str]:
+    """Return a cached answer, or None on miss/error."""
+    try:
+        return client.get(f"resp:{digest}")
+    except redis.RedisError as e:
+        logger.warning(f"Shared response cache read failed: {e}")
+        return None
+
+
+def put_response(client: redis.Redis, digest: str, answer: str, ttl: int) -> None:
+    """Cache an answer for ttl seconds."""
+    try:
+        client.set(f"resp:{digest}", answer, ex=ttl)
+    except redis.RedisError as e:
+        logger.warning(f"Shared response cache write failed: {e}")
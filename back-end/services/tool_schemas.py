@@ -12,8 +12,8 @@ Benefits:
 - Better error messages when validation fails
 """
 
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Any, Union
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 
 # =============================================================================
@@ -238,13 +238,14 @@ class ForeignKeysResult(ToolResultBase):
 # HELPER FUNCTIONS
 # =============================================================================
 
-def validate_tool_args(tool_name: str, args: Dict[str, Any]) -> BaseToolArgs:
+def validate_tool_args(tool_name: str, args: Union[str, Dict[str, Any]]) -> BaseToolArgs:
     """
     Validate tool arguments using Pydantic schema.
     
     Args:
         tool_name: Name of the tool
-        args: Raw arguments dict from AI
+        args: Raw arguments from AI - the JSON string as sent (parsed and
+            validated in one pass) or an already-parsed dict
         
     Returns:
         Validated Pydantic model
@@ -258,7 +259,13 @@ def validate_tool_args(tool_name: str, args: Dict[str, Any]) -> BaseToolArgs:
         raise ValueError(f"Unknown tool: {tool_name}")
     
     try:
+        if isinstance(args, str):
+            return schema_class.model_validate_json(args or '{}')
         return schema_class(**args)
+    except ValidationError as e:
+        if any(error['type'] == 'json_invalid' for error in e.errors()):
+            raise ValueError("Invalid JSON arguments")
+        raise ValueError(f"Invalid arguments for {tool_name}: {str(e)}")
     except Exception as e:
         raise ValueError(f"Invalid arguments for {tool_name}: {str(e)}")
 
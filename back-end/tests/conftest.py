@@ -0,0 +1,10 @@
+"""
+Pytest configuration.
+
+Config refuses to load without SECRET_KEY, so a test value is set
+before any application module is imported.
+"""
+
+import os
+
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
@@ -0,0 +1,78 @@
+"""
+ConnectionManager pool eviction tests.
+
+A fake adapter stands in for the database drivers, so no server is needed.
+"""
+
+import pytest
+
+import database.adapters
+import database.connection_manager
+from database.connection_manager import ConnectionManager
+from services.connection_service import ConnectionService
+
+
+class FakeAdapter:
+    """Adapter whose pools are plain dicts; records which pools were closed."""
+    
+    requires_server = False
+    
+    def __init__(self):
+        self.closed = []
+    
+    def create_connection_pool(self, config):
+        return {'database': config['database']}
+    
+    def get_connection_from_pool(self, pool):
+        return object()
+    
+    def return_connection_to_pool(self, pool, conn):
+        pass
+    
+    def close_pool(self, pool):
+        self.closed.append(pool)
+    
+    def validate_connection(self, conn):
+        return True
+
+
+FIRST = {'db_type': 'sqlite', 'database': 'first.db'}
+SECOND = {'db_type': 'sqlite', 'database': 'second.db'}
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = FakeAdapter()
+    monkeypatch.setattr(database.connection_manager, 'get_adapter', lambda db_type: adapter)
+    monkeypatch.setattr(database.adapters, 'get_adapter', lambda db_type: adapter)
+    return adapter
+
+
+@pytest.fixture
+def manager(monkeypatch, adapter):
+    manager = ConnectionManager()
+    manager._max_pools = 1
+    monkeypatch.setattr(database.connection_manager, 'get_connection_manager', lambda: manager)
+    ConnectionService.invalidate_validation_cache()
+    yield manager
+    ConnectionService.invalidate_validation_cache()
+
+
+def test_validation_then_eviction_closes_pool(manager, adapter):
+    assert ConnectionService._verify_db_connection(FIRST) is True
+    assert manager._pool_in_use[manager.get_pool_key(FIRST)] == 0
+    
+    manager.ensure_pool(SECOND)
+    
+    assert adapter.closed == [{'database': 'first.db'}]
+    assert manager.get_pool_key(FIRST) not in manager._pools
+
+
+def test_checked_out_pool_is_not_evicted(manager, adapter):
+    conn = manager.get_connection(FIRST)
+    manager.ensure_pool(SECOND)
+    assert adapter.closed == []
+    
+    manager.release_connection(FIRST, conn)
+    manager.ensure_pool({'db_type': 'sqlite', 'database': 'third.db'})
+    assert {'database': 'first.db'} in adapter.closed
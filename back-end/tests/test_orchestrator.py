@@ -0,0 +1,44 @@
+"""
+Orchestrator tests: local non-SQL code refusal and response cache keys.
+"""
+
+import pytest
+
+from services.llm.orchestrator import _NON_SQL_CODE_RE, _response_cache_key
+
+
+@pytest.mark.parametrize('message', [
+    "Write me a Python function to reverse a string",
+    "please generate a rust program for fizzbuzz",
+    "Can you write some JavaScript code that animates a button?",
+    "give me a bash script to rename my photos",
+])
+def test_non_database_code_requests_are_refused(message):
+    assert _NON_SQL_CODE_RE.match(message)
+
+
+@pytest.mark.parametrize('message', [
+    "give me a python snippet that runs this query against my DB",
+    "write a bash script to export this table",
+    "Write a Python script that backs up my Postgres database",
+    "create a java class that maps rows from the orders table",
+    "generate python code to load this CSV into MySQL",
+    "write an SQL query for the top 10 customers",
+    "what does this python code do?",
+])
+def test_database_requests_reach_the_model(message):
+    assert _NON_SQL_CODE_RE.match(message) is None
+
+
+MESSAGES = [{"role": "user", "content": "How many orders were placed today?"}]
+SHOP = {'db_type': 'sqlite', 'database': 'shop.db'}
+CRM = {'db_type': 'sqlite', 'database': 'crm.db'}
+
+
+def test_response_cache_key_is_scoped_to_user_and_database():
+    key = _response_cache_key('model', MESSAGES, 'alice', SHOP)
+    
+    assert key == _response_cache_key('model', MESSAGES, 'alice', dict(SHOP))
+    assert key != _response_cache_key('model', MESSAGES, 'bob', SHOP)
+    assert key != _response_cache_key('model', MESSAGES, 'alice', CRM)
+    assert key != _response_cache_key('model', MESSAGES, 'alice', dict(SHOP, schema='sales'))
@@ -0,0 +1,39 @@
+"""
+PromptBuilder Mermaid addendum tests.
+"""
+
+from services.llm.prompt_builder import PromptBuilder, _MERMAID_ADDENDUM
+
+
+def _system_prompt(messages):
+    return messages[0]["content"]
+
+
+def test_diagram_ask_on_later_turn_gets_addendum():
+    conversation_id = 'conv-later-diagram'
+    history = []
+    
+    first = PromptBuilder.build_messages(history, "How many users signed up today?",
+                                         conversation_id=conversation_id)
+    assert _MERMAID_ADDENDUM not in _system_prompt(first)
+    history = first[1:] + [{"role": "assistant", "content": "42 users."}]
+    
+    second = PromptBuilder.build_messages(history, "Draw an ER diagram of my schema",
+                                          conversation_id=conversation_id)
+    assert _MERMAID_ADDENDUM in _system_prompt(second)
+
+
+def test_addendum_stays_on_after_diagram_ask_leaves_history():
+    conversation_id = 'conv-latched'
+    PromptBuilder.build_messages(None, "Show me a mermaid diagram", conversation_id=conversation_id)
+    
+    # Windowed history no longer contains the diagram ask
+    later = PromptBuilder.build_messages([{"role": "user", "content": "Thanks"}],
+                                         "Now count the orders", conversation_id=conversation_id)
+    assert _MERMAID_ADDENDUM in _system_prompt(later)
+
+
+def test_schema_questions_do_not_trigger_addendum():
+    messages = PromptBuilder.build_messages(None, "What is the relationship between orders and users?",
+                                            conversation_id='conv-no-diagram')
+    assert _MERMAID_ADDENDUM not in _system_prompt(messages)
@@ -0,0 +1 @@
+# Utils module - Shared helpers with no service dependencies